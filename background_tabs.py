@@ -0,0 +1,167 @@
+import ctypes
+import logging
+import sys
+import time
+from ctypes import wintypes
+
+import psutil
+
+# --- Constants ---
+POLICIES = ('none', 'hide', 'minimize', 'throttle')
+SW_HIDE = 0
+SW_SHOWNOACTIVATE = 4
+SW_MINIMIZE = 6
+PROCESS_SET_INFORMATION = 0x0200
+PROCESS_POWER_THROTTLING_CURRENT_VERSION = 1
+PROCESS_POWER_THROTTLING_EXECUTION_SPEED = 0x1
+PROCESS_INFORMATION_POWER_THROTTLING = 4
+
+
+class PROCESS_POWER_THROTTLING_STATE(ctypes.Structure):
+    _fields_ = [("Version", wintypes.ULONG), ("ControlMask", wintypes.ULONG), ("StateMask", wintypes.ULONG)]
+
+
+# --- Default window and process operations ---
+def show_window(hwnd, command):
+    ctypes.windll.user32.ShowWindowAsync(hwnd, command)
+
+
+def set_efficiency_mode(pid, enabled):
+    # EcoQoS on Windows 11; silently unavailable on older systems
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_SET_INFORMATION, False, pid)
+    if not handle:
+        return False
+    try:
+        state = PROCESS_POWER_THROTTLING_STATE(PROCESS_POWER_THROTTLING_CURRENT_VERSION,
+                                               PROCESS_POWER_THROTTLING_EXECUTION_SPEED,
+                                               PROCESS_POWER_THROTTLING_EXECUTION_SPEED if enabled else 0)
+        return bool(kernel32.SetProcessInformation(handle, PROCESS_INFORMATION_POWER_THROTTLING,
+                                                   ctypes.byref(state), ctypes.sizeof(state)))
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def set_process_throttled(pid, throttled, saved_priority=None):
+    # Returns the priority to restore later
+    process = psutil.Process(pid)
+    previous = process.nice()
+    if throttled:
+        low_priority = psutil.IDLE_PRIORITY_CLASS if sys.platform == 'win32' else 19
+        process.nice(low_priority)
+    elif saved_priority is not None:
+        process.nice(saved_priority)
+    if sys.platform == 'win32':
+        set_efficiency_mode(pid, throttled)
+    return previous
+
+
+def process_cpu_seconds(pid):
+    try:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    except psutil.Error:
+        return None
+
+
+# --- Background tab policy ---
+# Applied when a tab stops being the current one and reverted when it becomes current again.
+# A process is not throttled while its window is the foreground tab, so activate the new
+# tab before deactivating the previous one.
+class BackgroundTabPolicy:
+    def __init__(self, policy='none', allow_list=(), show_window=show_window,
+                 set_process_throttled=set_process_throttled, process_name=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown background policy: {policy!r}")
+        self.policy = policy
+        self.allow_list = {self.normalize(name) for name in allow_list}
+        self.show_window = show_window
+        self.set_process_throttled = set_process_throttled
+        self.process_name = process_name or self._read_process_name
+        self.process_names = {}
+        self.applied = {}  # hwnd -> (policy, pid, started, cpu seconds at start)
+        self.throttled = {}  # pid -> saved priority
+        self.foreground_pid = None
+
+    @staticmethod
+    def normalize(name):
+        name = name.strip().lower()
+        return name if name.endswith(".exe") else name + ".exe"
+
+    def _read_process_name(self, pid):
+        try:
+            return psutil.Process(pid).name()
+        except psutil.Error:
+            return ""
+
+    def is_allowed(self, pid):
+        if pid not in self.process_names:
+            self.process_names[pid] = self.normalize(self.process_name(pid) or "")
+        return self.process_names[pid] in self.allow_list
+
+    def activate(self, entry):
+        self.foreground_pid = entry.pid
+        self.revert(entry.hwnd)
+        if entry.pid in self.throttled:
+            self._unthrottle(entry.pid)
+
+    def deactivate(self, entry):
+        if self.policy == 'none' or entry.hwnd in self.applied or self.is_allowed(entry.pid):
+            return
+        if self.policy == 'throttle' and (entry.pid == self.foreground_pid or entry.pid in self.throttled):
+            return
+        started = time.perf_counter()
+        try:
+            if self.policy == 'hide':
+                self.show_window(entry.hwnd, SW_HIDE)
+            elif self.policy == 'minimize':
+                self.show_window(entry.hwnd, SW_MINIMIZE)
+            else:
+                self.throttled[entry.pid] = self.set_process_throttled(entry.pid, True)
+        except Exception as e:
+            logging.error(f"Could not apply background policy '{self.policy}' to '{entry.title}': {e}")
+            return
+        self.applied[entry.hwnd] = (self.policy, entry.pid, time.perf_counter(), process_cpu_seconds(entry.pid))
+        logging.info(f"Background tab '{entry.title}': '{self.policy}' applied in "
+                     f"{(time.perf_counter() - started) * 1000:.2f} ms")
+
+    def revert(self, hwnd):
+        applied = self.applied.pop(hwnd, None)
+        if not applied:
+            return
+        policy, pid, since, cpu_at_start = applied
+        started = time.perf_counter()
+        try:
+            if policy in ('hide', 'minimize'):
+                self.show_window(hwnd, SW_SHOWNOACTIVATE)
+        except Exception as e:
+            logging.error(f"Could not revert background policy '{policy}' for window {hwnd}: {e}")
+        cpu_now = process_cpu_seconds(pid)
+        cpu_used = f"{cpu_now - cpu_at_start:.2f} s CPU" if cpu_now is not None and cpu_at_start is not None else "CPU unknown"
+        logging.info(f"Foreground tab {hwnd}: '{policy}' reverted in {(time.perf_counter() - started) * 1000:.2f} ms "
+                     f"after {time.perf_counter() - since:.1f} s in background ({cpu_used} by process {pid})")
+
+    def _unthrottle(self, pid):
+        saved_priority = self.throttled.pop(pid)
+        try:
+            self.set_process_throttled(pid, False, saved_priority)
+        except Exception as e:
+            logging.error(f"Could not restore priority of process {pid}: {e}")
+
+    def forget(self, entry):
+        self.revert(entry.hwnd)
+        if entry.pid in self.throttled:
+            self._unthrottle(entry.pid)
+
+    def revert_all(self):
+        for hwnd in list(self.applied):
+            self.revert(hwnd)
+        for pid in list(self.throttled):
+            self._unthrottle(pid)
+        self.foreground_pid = None
+
+    def set_policy(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown background policy: {policy!r}")
+        self.revert_all()
+        self.policy = policy
@@ -0,0 +1,165 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+# Runs anywhere: no desktop, no pywin32
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import qInstallMessageHandler
+from PyQt5.QtWidgets import QApplication
+
+import codigo
+from win_events import ScriptedDragSource, ScriptedWindowSource
+from window_backend import SimulatedWindowBackend
+
+# --- Defaults ---
+BASELINE_PATH = "benchmark_baseline.json"
+WINDOW_COUNTS = (1, 10, 50, 100, 200)
+# Units are part of the name; every value is lower-is-better
+SCENARIOS = ('drag_tick_us', 'embed_ms', 'restore_ms', 'resize_storm_ms', 'resize_calls_per_frame', 'mode_switch_ms')
+# Absolute slowdowns below these are timer and scheduler noise, whatever the ratio
+NOISE_FLOORS = {'drag_tick_us': 5.0, 'embed_ms': 2.0, 'restore_ms': 5.0, 'resize_storm_ms': 10.0,
+                'resize_calls_per_frame': 1, 'mode_switch_ms': 1.0}
+DRAG_TICKS = 200
+RESIZE_EVENTS = 30
+MODE_SWITCHES = 10
+
+
+def wait_for(app, condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def geometry_calls(backend):
+    return backend.call_counts['defer_window_pos'] + backend.call_counts['set_window_pos']
+
+
+def run_scenarios(app, count, latency):
+    backend = SimulatedWindowBackend(latency=latency)
+    manager = codigo.GroupManager(drag_source=ScriptedDragSource(), window_source=ScriptedWindowSource(),
+                                  backend=backend)
+    group = manager.create_group()
+    hwnds = [backend.create_window(f"Window {index}", pid=2000 + index) for index in range(count)]
+    results = {}
+
+    started = time.perf_counter()
+    group.group_windows(hwnds)
+    wait_for(app, lambda: not group.active_embeds)
+    results['embed_ms'] = (time.perf_counter() - started) * 1000
+    app.processEvents()
+
+    # Drag tick: one poll of the cursor while a window is dragged over the group
+    center = group.geometry().center()
+    backend.cursor_pos = (center.x(), center.y())
+    manager.dragged_window_hwnd = backend.create_window("Dragged")
+    started = time.perf_counter()
+    for _ in range(DRAG_TICKS):
+        manager.check_for_drag_drop()
+    results['drag_tick_us'] = (time.perf_counter() - started) / DRAG_TICKS * 1e6
+    manager.reset_drag_state()
+
+    started = time.perf_counter()
+    for index in range(MODE_SWITCHES):
+        group.set_mode('grid' if index % 2 == 0 else 'tabs')
+        app.processEvents()
+    results['mode_switch_ms'] = (time.perf_counter() - started) / MODE_SWITCHES * 1000
+
+    # Resize storm in grid mode: every embedded window changes size on every step
+    group.set_mode('grid')
+    app.processEvents()
+    geometry = group.geometry()
+    calls_before = geometry_calls(backend)
+    commits_before = group.layout_scheduler.backend.commit_count
+    started = time.perf_counter()
+    for step in range(RESIZE_EVENTS):
+        group.resize(geometry.width() + step * 7, geometry.height() + step * 5)
+        app.processEvents()
+    group.layout_scheduler.flush()
+    results['resize_storm_ms'] = (time.perf_counter() - started) * 1000
+    # Win32 positioning calls per committed frame: one per embedded window, as each has its own parent
+    frames = max(1, group.layout_scheduler.backend.commit_count - commits_before)
+    results['resize_calls_per_frame'] = (geometry_calls(backend) - calls_before) / frames
+
+    started = time.perf_counter()
+    group.ungroup_all()
+    wait_for(app, lambda: not group.active_restores)
+    results['restore_ms'] = (time.perf_counter() - started) * 1000
+
+    group.ready_to_close = True
+    group.close()
+    group.deleteLater()
+    manager.remove_group(group)
+    app.processEvents()
+    return results
+
+
+def run(counts, latency, repeat):
+    results = {scenario: {} for scenario in SCENARIOS}
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    for count in counts:
+        runs = [run_scenarios(app, count, latency) for _ in range(repeat)]
+        for scenario in SCENARIOS:
+            # The fastest run is the least disturbed by the rest of the machine
+            results[scenario][str(count)] = min(run[scenario] for run in runs)
+    return results
+
+
+# --- Baseline comparison ---
+def compare(results, baseline, threshold):
+    regressions = []
+    lines = [f"{'scenario':<22} {'N':>4} {'value':>10} {'baseline':>10} {'change':>8}"]
+    for scenario in SCENARIOS:
+        for count, value in results[scenario].items():
+            reference = baseline.get(scenario, {}).get(count)
+            if reference is None:
+                lines.append(f"{scenario:<22} {count:>4} {value:>10.3f} {'-':>10} {'':>8}")
+                continue
+            change = (value - reference) / reference if reference else 0.0
+            regressed = change > threshold and value - reference > NOISE_FLOORS[scenario]
+            marker = "  REGRESSION" if regressed else ""
+            lines.append(f"{scenario:<22} {count:>4} {value:>10.3f} {reference:>10.3f} {change:>+7.0%}{marker}")
+            if regressed:
+                regressions.append((scenario, count))
+    return lines, regressions
+
+
+# python benchmark.py [--save-baseline]
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the grouper against simulated windows.")
+    parser.add_argument("--counts", default=",".join(map(str, WINDOW_COUNTS)), help="comma-separated window counts")
+    parser.add_argument("--latency-us", type=float, default=0.0, help="simulated latency of every Win32 call")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per window count; the fastest is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="stored results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # The offscreen platform warns about every native child window
+    qInstallMessageHandler(lambda *message: None)
+    codigo.RESTORE_TITLE_HOLD_SECONDS = 0  # measure the restore work, not the deliberate pause
+
+    counts = [int(count) for count in args.counts.split(",")]
+    results = run(counts, args.latency_us / 1e6, max(1, args.repeat))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    lines, regressions = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "latency_us": args.latency_us, "results": results}, baseline_file, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1)
@@ -1,150 +1,433 @@
 import sys
-import win32gui
-import win32con
-import win32api
-import win32process
-import ctypes
-from ctypes import wintypes
-import subprocess
+import argparse
+import os
 import psutil
 import logging
+import queue
+import threading
 import time
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget,
-                             QLabel, QVBoxLayout, QMenuBar, QAction, QStatusBar, QShortcut, QSplitter, QStackedWidget)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPoint, QEvent
-from PyQt5.QtGui import QGuiApplication, QMouseEvent, QKeyEvent, QKeySequence
-
-# --- Logging Configuration ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
-                    handlers=[logging.FileHandler("window_grouper.log"), logging.StreamHandler()])
-
-# --- ctypes Configuration for SetWindowLongPtr ---
-user32 = ctypes.windll.user32
-SetWindowLongPtrW = user32.SetWindowLongPtrW
-SetWindowLongPtrW.restype = ctypes.c_void_p
-SetWindowLongPtrW.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_void_p]
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabBar, QWidget,
+                             QLabel, QVBoxLayout, QMenuBar, QAction, QStatusBar, QShortcut, QActionGroup)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QPoint, QEvent, QObject
+from PyQt5.QtGui import QGuiApplication, QMouseEvent, QKeyEvent, QKeySequence, QWheelEvent
+from win_events import WinEventDragSource, WinEventWindowSource
+from layout_scheduler import LayoutScheduler
+from window_registry import GroupedWindow, WindowRegistry
+from control import ControlServer
+from window_index import WindowIndex, read_process_info
+from grouping_rules import RuleEngine
+from tiling import TilingLayout
+from background_tabs import BackgroundTabPolicy
+from input_forwarding import InputForwarder
+from logging_setup import configure_logging
+from session import SESSION_PATH, SessionJournal, match_saved_windows, recover_orphaned_windows
+from metrics import METRICS_PATH, LoopLagProbe, Metrics
+from window_lifecycle import ProcessExitWatcher, WindowLifecycle
+from quick_switch import QuickSwitcher, SwitchIndex
+from thumbnails import THUMBNAIL_CACHE_BYTES, OverviewPanel, TabHoverPreview, ThumbnailCache, ThumbnailCapturer
+from window_backend import (Win32WindowBackend, WindowBackend, HWND_NOTOPMOST, HWND_TOPMOST, SW_RESTORE, SW_SHOW,
+                            SWP_FRAMECHANGED, SWP_NOMOVE, SWP_NOSIZE, SWP_NOZORDER, WS_CAPTION, WS_CHILD)
 
 # --- Constants ---
 RESTORING_TITLE_PREFIX = "RESTORING..."
+RESTORE_TITLE_HOLD_SECONDS = 0.2
+RESTORE_DEADLINE_MS = 3000
+EMBED_PROBE_TIMEOUT_MS = 500
+EMBED_DEADLINE_MS = 5000
+EMBED_WORKERS = 8
+THUMBNAIL_WORKERS = 2
+SESSION_TITLE_FLUSH_MS = 2000
+
+
+# --- Per-window jobs off the GUI thread ---
+# Each job talks to one other application, so a hung one only blocks its own worker. Results
+# come back through a queued signal; windows that have not answered by the deadline are
+# reported as "timed out". Answers after the deadline still come out of window_done, since
+# the job may have changed the window after all.
+class WindowPipeline(QObject):
+    window_finished = pyqtSignal(int, str, object)  # emitted on worker threads
+    window_done = pyqtSignal(int, str, object)  # the same, on the GUI thread
+    finished = pyqtSignal(dict)
+    action = "Job"
+    success = "done"
+
+    def __init__(self, jobs, deadline_ms, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs  # hwnd -> argument of run_job
+        self.deadline_ms = deadline_ms
+        self.outcomes = {}
+        self.is_finished = False
+        self.started_at = None
+        self.window_finished.connect(self._record_outcome)
+
+    def run_job(self, hwnd, argument):
+        # Runs on a worker thread; returns (outcome, details)
+        raise NotImplementedError
+
+    def submit(self, function, *args):
+        # Daemon threads so a window that never answers cannot keep the process alive
+        threading.Thread(target=function, args=args, daemon=True).start()
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        if not self.jobs:
+            QTimer.singleShot(0, self._finish)
+            return
+        for hwnd, argument in self.jobs.items():
+            self.submit(self._run_job, hwnd, argument)
+        QTimer.singleShot(self.deadline_ms, self._finish)
+
+    def _run_job(self, hwnd, argument):
+        outcome, details = self.run_job(hwnd, argument)
+        self.window_finished.emit(hwnd, outcome, details)
+
+    def latency(self):
+        # Seconds since the batch started, queueing included
+        return time.perf_counter() - self.started_at
+
+    def _record_outcome(self, hwnd, outcome, details):
+        if self.is_finished:
+            logging.info(f"Window {hwnd} answered after the deadline: {outcome}")
+        else:
+            self.outcomes[hwnd] = outcome
+        self.window_done.emit(hwnd, outcome, details)
+        if not self.is_finished and len(self.outcomes) == len(self.jobs):
+            self._finish()
+
+    def _finish(self):
+        if self.is_finished:
+            return
+        self.is_finished = True
+        for hwnd in self.jobs:
+            if hwnd not in self.outcomes:
+                self.outcomes[hwnd] = "timed out"
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        succeeded = sum(1 for outcome in self.outcomes.values() if outcome == self.success)
+        logging.info(f"{self.action} finished in {elapsed_ms:.0f} ms: "
+                     f"{succeeded}/{len(self.jobs)} windows {self.success}.")
+        for hwnd, outcome in self.outcomes.items():
+            if outcome != self.success:
+                logging.warning(f"Window {hwnd} not {self.success}: {outcome}")
+        self.finished.emit(self.outcomes)
+
+
+# --- Asynchronous restore pipeline ---
+# Runs on a worker thread; a hung application only blocks its own worker.
+def restore_embedded_window(backend, hwnd, original_style):
+    if not backend.is_window(hwnd):
+        return "gone"
+    original_title = backend.get_text(hwnd)
+    temp_title = f"{RESTORING_TITLE_PREFIX} {original_title}"
+    try:
+        backend.set_text(hwnd, temp_title)
+        logging.info(f"Restoring '{original_title}' (temporary title: '{temp_title}')")
+
+        if original_style is not None:
+            backend.set_style(hwnd, original_style)
+        backend.set_parent(hwnd, None)
+        backend.show_window(hwnd, SW_RESTORE)
+        backend.set_window_pos(hwnd, None, 100, 100, 800, 600, SWP_NOZORDER | SWP_FRAMECHANGED)
+
+        # Keep the temporary title briefly so no grouper grabs the window while it is floating again
+        time.sleep(RESTORE_TITLE_HOLD_SECONDS)
+        backend.set_text(hwnd, original_title)
+        logging.info(f"Title restored to '{original_title}'")
+        return "restored"
+    except Exception as e:
+        logging.error(f"Error restoring window: {e}")
+        try:
+            backend.set_text(hwnd, original_title)
+        except:
+            pass
+        return f"failed: {e}"
+
+
+class RestorePipeline(WindowPipeline):
+    action = "Restore"
+    success = "restored"
+
+    def __init__(self, entries, backend, deadline_ms=RESTORE_DEADLINE_MS, parent=None):
+        super().__init__({entry.hwnd: entry.original_style for entry in entries}, deadline_ms, parent)
+        self.backend = backend
+
+    def run_job(self, hwnd, original_style):
+        return restore_embedded_window(self.backend, hwnd, original_style), None
+
+
+# --- Parallel embedding ---
+# The cross-process calls of embedding run on worker threads, after a probe with a timeout,
+# so a hung application is rejected quickly instead of freezing the grouper with it.
+def embed_window(backend, hwnd, parent_id, probe_timeout_ms=EMBED_PROBE_TIMEOUT_MS):
+    if not backend.is_window(hwnd):
+        return "gone", None, None
+    if not backend.is_responsive(hwnd, probe_timeout_ms):
+        return "not responding", None, None
+    original_style = None
+    try:
+        original_style = backend.get_style(hwnd)
+        pid = backend.get_window_pid(hwnd)
+        backend.set_style(hwnd, (original_style & ~WS_CAPTION) | WS_CHILD)
+        backend.set_parent(hwnd, parent_id)
+        backend.show_window(hwnd, SW_SHOW)
+        return "embedded", original_style, pid
+    except Exception as e:
+        # Leave the window floating rather than half embedded
+        if original_style is not None:
+            try:
+                backend.set_parent(hwnd, None)
+                backend.set_style(hwnd, original_style)
+            except Exception:
+                pass
+        return f"failed: {e}", None, None
+
+
+# A fixed number of daemon threads shared by every group, so a batch of any size never
+# starts more than max_workers threads.
+class WorkerPool:
+    def __init__(self, max_workers=EMBED_WORKERS, name="embed-worker"):
+        self.max_workers = max_workers
+        self.name = name
+        self.jobs = queue.Queue()
+        self.workers = []
+
+    def submit(self, function, *args):
+        self.jobs.put((function, args))
+        if len(self.workers) < self.max_workers:
+            worker = threading.Thread(target=self._run, name=f"{self.name}-{len(self.workers)}", daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    def _run(self):
+        while True:
+            function, args = self.jobs.get()
+            try:
+                function(*args)
+            except Exception as e:
+                logging.error(f"Error in worker job: {e}")
+
+
+class EmbedPipeline(WindowPipeline):
+    action = "Embedding"
+    success = "embedded"
+
+    def __init__(self, jobs, backend, pool, deadline_ms=EMBED_DEADLINE_MS, probe_timeout_ms=EMBED_PROBE_TIMEOUT_MS,
+                 parent=None):
+        # jobs: hwnd -> native id of the container it goes into
+        super().__init__(jobs, deadline_ms, parent)
+        self.backend = backend
+        self.pool = pool
+        self.probe_timeout_ms = probe_timeout_ms
+
+    def submit(self, function, *args):
+        self.pool.submit(function, *args)
+
+    def run_job(self, hwnd, parent_id):
+        started = time.perf_counter()
+        outcome, original_style, pid = embed_window(self.backend, hwnd, parent_id, self.probe_timeout_ms)
+        return outcome, (original_style, pid, time.perf_counter() - started)
+
+
+# Process exits are reported on the watcher thread and handled on the GUI thread
+class ProcessExitRelay(QObject):
+    exited = pyqtSignal(int)
 
 
 # --- Widget container that forwards events (NO SHORTCUT LOGIC) ---
 class ResizableContainer(QWidget):
     resized = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, backend, parent=None):
         super().__init__(parent)
+        self.backend = backend
         self.setStyleSheet("background-color: black;")
+        self.forwarder = InputForwarder(backend.post_message, lambda delay, callback: QTimer.singleShot(delay, callback),
+                                        self.child_origin)
+
+    def attach(self, hwnd):
+        self.hwnd = hwnd
+        self.forwarder.attach(hwnd)
+
+    def child_origin(self, hwnd):
+        # Client origin of the embedded window relative to this container; cached by the forwarder
+        child_x, child_y = self.backend.client_to_screen(hwnd, (0, 0))
+        our_origin = self.mapToGlobal(QPoint(0, 0))
+        return child_x - our_origin.x(), child_y - our_origin.y()
 
     def resizeEvent(self, event):
+        self.forwarder.invalidate_origin()
         self.resized.emit()
         super().resizeEvent(event)
 
+    def moveEvent(self, event):
+        self.forwarder.invalidate_origin()
+        super().moveEvent(event)
+
     def mousePressEvent(self, event: QMouseEvent):
-        if not hasattr(self, 'hwnd') or not win32gui.IsWindow(self.hwnd):
-            super().mousePressEvent(event);
-            return
-        global_pos = self.mapToGlobal(event.pos());
-        child_rect = win32gui.GetWindowRect(self.hwnd)
-        x = global_pos.x() - child_rect[0];
-        y = global_pos.y() - child_rect[1];
-        lparam = win32api.MAKELONG(x, y)
-        wparam = (win32con.HTCLIENT << 16) | (int(self.winId()) & 0xFFFF)
-        win32api.PostMessage(self.hwnd, win32con.WM_MOUSEACTIVATE, wparam, lparam)
-        win32api.PostMessage(self.hwnd, win32con.WM_SETFOCUS, int(self.winId()), 0)
-        if event.button() == Qt.LeftButton:
-            win32api.PostMessage(self.hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lparam)
-        elif event.button() == Qt.RightButton:
-            win32api.PostMessage(self.hwnd, win32con.WM_RBUTTONDOWN, win32con.MK_RBUTTON, lparam)
+        self.forwarder.mouse_press(event, int(self.winId()))
         super().mousePressEvent(event)
 
     def mouseReleaseEvent(self, event: QMouseEvent):
-        if not hasattr(self, 'hwnd') or not win32gui.IsWindow(self.hwnd):
-            super().mouseReleaseEvent(event);
-            return
-        global_pos = self.mapToGlobal(event.pos());
-        child_rect = win32gui.GetWindowRect(self.hwnd)
-        x = global_pos.x() - child_rect[0];
-        y = global_pos.y() - child_rect[1];
-        lparam = win32api.MAKELONG(x, y)
-        if event.button() == Qt.LeftButton:
-            win32api.PostMessage(self.hwnd, win32con.WM_LBUTTONUP, 0, lparam)
-        elif event.button() == Qt.RightButton:
-            win32api.PostMessage(self.hwnd, win32con.WM_RBUTTONUP, 0, lparam)
+        self.forwarder.mouse_release(event)
         super().mouseReleaseEvent(event)
 
     def mouseMoveEvent(self, event: QMouseEvent):
-        if not hasattr(self, 'hwnd') or not win32gui.IsWindow(self.hwnd):
-            super().mouseMoveEvent(event);
-            return
-        global_pos = self.mapToGlobal(event.pos());
-        child_rect = win32gui.GetWindowRect(self.hwnd)
-        x = global_pos.x() - child_rect[0];
-        y = global_pos.y() - child_rect[1];
-        lparam = win32api.MAKELONG(x, y)
-        win32api.PostMessage(self.hwnd, win32con.WM_MOUSEMOVE, 0, lparam)
+        self.forwarder.mouse_move(event)
         super().mouseMoveEvent(event)
 
+    def wheelEvent(self, event: QWheelEvent):
+        if not self.forwarder.wheel(event):
+            super().wheelEvent(event)
+
     def keyPressEvent(self, event: QKeyEvent):
-        if not hasattr(self, 'hwnd') or not win32gui.IsWindow(self.hwnd): return
-        key = event.key();
-        text = event.text()
-        vk_code_map = {Qt.Key_Enter: win32con.VK_RETURN, Qt.Key_Return: win32con.VK_RETURN,
-                       Qt.Key_Escape: win32con.VK_ESCAPE, Qt.Key_Tab: win32con.VK_TAB,
-                       Qt.Key_Backspace: win32con.VK_BACK, Qt.Key_Delete: win32con.VK_DELETE,
-                       Qt.Key_Left: win32con.VK_LEFT, Qt.Key_Right: win32con.VK_RIGHT, Qt.Key_Up: win32con.VK_UP,
-                       Qt.Key_Down: win32con.VK_DOWN, }
-        if key in vk_code_map:
-            vk_code = vk_code_map[key]
-        elif len(text) == 1:
-            vk_code = win32api.VkKeyScan(text)
+        if not self.forwarder.key_press(event):
+            super().keyPressEvent(event)
+
+    def keyReleaseEvent(self, event: QKeyEvent):
+        if not self.forwarder.key_release(event):
+            super().keyReleaseEvent(event)
+
+
+# --- Persistent window host ---
+# Every container of a group lives here for its whole life, in both modes. Switching between
+# tab and grid mode only changes which containers are visible and where they are, so the
+# embedded native windows are never reparented.
+class WindowHost(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mode = 'tabs'
+        self.current = None
+        self.tiling = TilingLayout('balanced')
+        self.placeholder = QLabel(
+            "Drag a window here to start grouping\n\nShortcuts:\nCtrl+Space: Next Tab (only when main window is active)\nCtrl+Shift+Space: Previous Tab\nCtrl+1/2: Switch Mode",
+            self)
+        self.placeholder.setAlignment(Qt.AlignCenter)
+        self.placeholder.setStyleSheet("font-size: 16px; color: #888;")
+
+    def add_containers(self, containers):
+        for container in containers:
+            container.setParent(self)
+            self.tiling.add(container)
+        self.placeholder.hide()
+        if self.mode == 'grid':
+            self.relayout()
+        for container in containers:
+            container.setVisible(self.mode == 'grid')
+
+    def remove_container(self, container):
+        self.tiling.remove(container)
+        container.hide()
+        if self.current is container:
+            self.current = None
+        if not len(self.tiling):
+            self.placeholder.show()
+        self.relayout()
+
+    def set_current(self, container):
+        if container is self.current:
+            return
+        previous = self.current
+        self.current = container
+        if self.mode == 'tabs':
+            if previous is not None:
+                previous.hide()
+            if container is not None:
+                container.setGeometry(self.rect())
+                container.show()
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode == 'grid':
+            # Panes were resized or hidden in tab mode, so every rectangle is applied again
+            self.tiling.invalidate()
+            self.relayout()
+            for container in self.tiling.keys:
+                container.show()
         else:
-            super().keyPressEvent(event); return
-        win32api.PostMessage(self.hwnd, win32con.WM_KEYDOWN, vk_code, 0)
-        win32api.PostMessage(self.hwnd, win32con.WM_CHAR, ord(text), 0)
-        win32api.PostMessage(self.hwnd, win32con.WM_KEYUP, vk_code, 0)
-        super().keyPressEvent(event)
+            for container in self.tiling.keys:
+                if container is not self.current:
+                    container.hide()
+            self.relayout()
+            if self.current is not None:
+                self.current.show()
+
+    def set_layout_kind(self, kind):
+        self.tiling.set_kind(kind)
+        self.relayout()
+
+    def relayout(self):
+        self.placeholder.setGeometry(self.rect())
+        if self.mode == 'tabs':
+            if self.current is not None:
+                self.current.setGeometry(self.rect())
+            return
+        for container, (x, y, width, height) in self.tiling.relayout(self.width(), self.height()).items():
+            container.setGeometry(x, y, width, height)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.relayout()
 
 
 # --- Main Window ---
 class WindowGrouper(QMainWindow):
-    def __init__(self):
+    def __init__(self, manager, name="1", background_allow_list=()):
         super().__init__()
+        self.manager = manager
+        self.backend = manager.backend
+        self.name = name
+        self.background_policy = BackgroundTabPolicy('none', background_allow_list,
+                                                     show_window=self.backend.show_window_async)
         self.mode = 'tabs'
-        self.setWindowTitle("Window Grouper")
+        self.setWindowTitle("Window Grouper" if name == "1" else f"Window Grouper {name}")
         self.setGeometry(100, 100, 1200, 800)
         self.is_always_on_top = True
         self.update_window_flags()
         self.create_menu_bar()
-        self.dragged_window_hwnd = None
-        self.was_button_pressed = False
+        self.registry = WindowRegistry()
+        self.active_restores = []
+        self.active_embeds = []
+        self.ready_embeds = []  # embedded windows waiting for the next frame to be attached
+        self.pending_embeds = {}  # hwnd -> (container, title) while its embedding runs
+        self.abandoned_embeds = {}  # the same, for windows that missed the embed deadline
+        self.close_restore = None
+        self.ready_to_close = False
+
+        # Embedded window geometry is batched and committed at most once per frame
+        self.layout_scheduler = LayoutScheduler(self.backend.geometry_backend(),
+                                                lambda delay, callback: QTimer.singleShot(delay, callback))
 
-        self.stacked_widget = QStackedWidget()
-        self.setCentralWidget(self.stacked_widget)
+        central_widget = QWidget()
+        central_layout = QVBoxLayout(central_widget)
+        central_layout.setContentsMargins(0, 0, 0, 0)
+        central_layout.setSpacing(0)
+        self.setCentralWidget(central_widget)
 
-        self.tabs = QTabWidget()
+        # The tab bar only selects which container the host shows; it owns no widgets
+        self.tabs = QTabBar()
         self.tabs.setTabsClosable(True)
+        self.tabs.setExpanding(False)
         self.tabs.tabCloseRequested.connect(self.close_grouped_window)
-        self.stacked_widget.addWidget(self.tabs)
-
-        self.grid_splitter = QSplitter(Qt.Horizontal)
-        self.left_splitter = QSplitter(Qt.Vertical)
-        self.right_splitter = QSplitter(Qt.Vertical)
-        self.grid_splitter.addWidget(self.left_splitter)
-        self.grid_splitter.addWidget(self.right_splitter)
-        self.grid_splitter.setSizes([600, 600])
-        self.stacked_widget.addWidget(self.grid_splitter)
+        self.tabs.currentChanged.connect(self.on_current_tab_changed)
+        self.tab_indexes = {}  # hwnd -> tab index, kept in step with the tab bar
+        central_layout.addWidget(self.tabs)
 
-        self.switch_to_tab_mode()
+        self.host = WindowHost()
+        central_layout.addWidget(self.host, 1)
 
-        self.drag_timer = QTimer()
-        self.drag_timer.timeout.connect(self.check_for_drag_drop)
-        self.drag_timer.start(50)
+        # Takes the place of the host while open; the embedded windows are hidden, not reparented
+        self.overview = OverviewPanel(manager.thumbnail_capturer, self.show_grouped_window, self.close_overview)
+        self.overview.hide()
+        central_layout.addWidget(self.overview, 1)
+        self.tab_preview = TabHoverPreview(self.tabs, manager.thumbnail_capturer)
 
         self.create_shortcuts()
 
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        # Filled in by the group manager when instrumentation is on
+        self.metrics_label = QLabel()
+        self.metrics_label.hide()
+        self.status_bar.addPermanentWidget(self.metrics_label)
         self.status_bar.showMessage("Ready. Tab mode active.")
         self.center_on_screen()
         logging.info("Application started. Drag a window over it to group.")
@@ -167,6 +450,29 @@ class WindowGrouper(QMainWindow):
         grid_mode_action.setShortcut(QKeySequence("Ctrl+2"));
         grid_mode_action.triggered.connect(self.switch_to_grid_mode);
         view_menu.addAction(grid_mode_action)
+        overview_action = QAction("Overview", self)
+        overview_action.setShortcut(QKeySequence("Ctrl+E"))
+        overview_action.triggered.connect(self.toggle_overview)
+        view_menu.addAction(overview_action)
+        layout_menu = view_menu.addMenu("Grid Layout")
+        layout_group = QActionGroup(self)
+        self.layout_actions = {}
+        for kind, label in (('balanced', "Balanced"), ('master_stack', "Master and Stack"), ('bsp', "Binary Split")):
+            layout_action = QAction(label, self, checkable=True)
+            layout_action.setChecked(kind == 'balanced')
+            layout_action.triggered.connect(lambda checked, kind=kind: self.set_grid_layout(kind))
+            self.layout_actions[kind] = layout_action
+            layout_group.addAction(layout_action)
+            layout_menu.addAction(layout_action)
+        background_menu = view_menu.addMenu("Background Tabs")
+        background_group = QActionGroup(self)
+        for policy, label in (('none', "Keep Running"), ('hide', "Hide"), ('minimize', "Minimize"),
+                              ('throttle', "Lower Process Priority")):
+            policy_action = QAction(label, self, checkable=True)
+            policy_action.setChecked(policy == 'none')
+            policy_action.triggered.connect(lambda checked, policy=policy: self.set_background_policy(policy))
+            background_group.addAction(policy_action)
+            background_menu.addAction(policy_action)
         window_menu = menubar.addMenu('Window')
         new_window_action = QAction("New Group Window", self);
         new_window_action.setShortcut(QKeySequence("Ctrl+N"));
@@ -182,6 +488,11 @@ class WindowGrouper(QMainWindow):
         self.prev_tab_shortcut.setContext(Qt.WindowShortcut)
         self.prev_tab_shortcut.activated.connect(self.switch_to_previous_tab)
 
+        self.quick_switch_shortcut = QShortcut(QKeySequence("Ctrl+P"), self)
+        self.quick_switch_shortcut.setContext(Qt.WindowShortcut)
+        self.quick_switch_shortcut.activated.connect(self.open_quick_switcher)
+        self.quick_switcher = None
+
     # --- CORRECTION: Reactivate shortcuts with a delay to ensure stability ---
     def focusInEvent(self, event):
         super().focusInEvent(event)
@@ -196,60 +507,86 @@ class WindowGrouper(QMainWindow):
         self.next_tab_shortcut.setEnabled(True)
         self.prev_tab_shortcut.setEnabled(False)
         self.prev_tab_shortcut.setEnabled(True)
+        self.quick_switch_shortcut.setEnabled(False)
+        self.quick_switch_shortcut.setEnabled(True)
 
     def switch_to_tab_mode(self):
         if self.mode == 'tabs': return
-        self.mode = 'tabs'
-        self.stacked_widget.setCurrentIndex(0)
+        self.set_mode('tabs')
         self.status_bar.showMessage("Tab mode active.", 2000)
-        self.migrate_windows_from_splitter_to_tabs()
 
     def switch_to_grid_mode(self):
         if self.mode == 'grid': return
-        self.mode = 'grid'
-        self.stacked_widget.setCurrentIndex(1)
+        self.set_mode('grid')
         self.status_bar.showMessage("Grid mode active.", 2000)
-        self.migrate_windows_from_tabs_to_splitter()
-
-    def migrate_windows_from_tabs_to_splitter(self):
-        windows_to_migrate = []
-        for i in range(self.tabs.count()):
-            container = self.tabs.widget(i)
-            if hasattr(container, 'hwnd'):
-                windows_to_migrate.append(container)
-        self.tabs.clear()
-        for container in windows_to_migrate:
-            self.add_widget_to_splitter(container)
-        self.grid_splitter.show();
-        self.left_splitter.show();
-        self.right_splitter.show()
-        for container in windows_to_migrate: container.show()
-
-    def migrate_windows_from_splitter_to_tabs(self):
-        widgets_to_migrate = []
-        for i in range(self.grid_splitter.count()):
-            splitter = self.grid_splitter.widget(i)
-            for j in range(splitter.count()):
-                widget = splitter.widget(j)
-                if isinstance(widget, ResizableContainer):
-                    widgets_to_migrate.append(widget)
-        self.clear_splitter()
-        for container in widgets_to_migrate:
-            self.add_widget_to_tab(container)
-
-    def add_widget_to_splitter(self, container):
-        left_count = self.left_splitter.count()
-        right_count = self.right_splitter.count()
-        target_splitter = self.left_splitter if left_count <= right_count else self.right_splitter
-        target_splitter.addWidget(container)
-        container.setFocus()
-        container.show()
-
-    def clear_splitter(self):
-        while self.left_splitter.count():
-            self.left_splitter.widget(0).setParent(None)
-        while self.right_splitter.count():
-            self.right_splitter.widget(0).setParent(None)
+
+    def set_mode(self, mode):
+        started = time.perf_counter()
+        if self.overview.isVisible():
+            self.overview.close_overview()
+        self.mode = mode
+        # Windows that were or become visible change size and content
+        for entry in self.registry:
+            self.manager.thumbnails.mark_dirty(entry.hwnd)
+        self.tabs.setVisible(mode == 'tabs')
+        self.host.set_mode(mode)
+        # Every pane is visible in grid mode, so only tab mode has background tabs
+        if mode == 'tabs':
+            self.apply_background_policy()
+        else:
+            self.background_policy.revert_all()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logging.info(f"Switched to {mode} mode with {len(self.registry)} windows in {elapsed_ms:.1f} ms.")
+        self.manager.record_session('group', group=self.name, mode=mode)
+
+    def set_grid_layout(self, kind):
+        self.host.set_layout_kind(kind)
+        self.layout_actions[kind].setChecked(True)
+        self.manager.record_session('group', group=self.name, layout=kind)
+        self.status_bar.showMessage(f"Grid layout: {kind.replace('_', ' ')}.", 2000)
+
+    def on_current_tab_changed(self, index):
+        entry = self.registry.get(self.tabs.tabData(index)) if index >= 0 else None
+        previous = self.host.current
+        self.host.set_current(entry.container if entry else None)
+        if previous is not None:
+            self.manager.thumbnails.mark_dirty(previous.hwnd)
+        if entry:
+            self.manager.switch_index.touch(entry.hwnd)
+            self.manager.thumbnails.mark_dirty(entry.hwnd)
+        if self.mode == 'tabs':
+            if entry:
+                self.background_policy.activate(entry)
+                entry.container.setFocus()
+            previous_entry = self.registry.get(previous.hwnd) if previous is not None else None
+            if previous_entry and previous_entry is not entry:
+                self.background_policy.deactivate(previous_entry)
+
+    def set_background_policy(self, policy):
+        self.background_policy.set_policy(policy)
+        # Grid mode shows every pane; set_mode('tabs') applies the policy
+        if self.mode == 'tabs':
+            self.apply_background_policy()
+        self.status_bar.showMessage(f"Background tabs: {policy}.", 2000)
+
+    def apply_background_policy(self):
+        current = self.host.current
+        for entry in self.registry:
+            if entry.container is current:
+                self.background_policy.activate(entry)
+        for entry in self.registry:
+            if entry.container is not current:
+                self.background_policy.deactivate(entry)
+
+    def tab_index_of(self, hwnd):
+        return self.tab_indexes.get(hwnd, -1)
+
+    def remove_tab(self, index):
+        self.tab_indexes.pop(self.tabs.tabData(index), None)
+        self.tabs.removeTab(index)
+        # Only the tabs after the removed one shift
+        for later in range(index, self.tabs.count()):
+            self.tab_indexes[self.tabs.tabData(later)] = later
 
     def switch_to_next_tab(self):
         if self.mode == 'tabs' and self.tabs.count() > 1:
@@ -265,15 +602,53 @@ class WindowGrouper(QMainWindow):
             self.tabs.setCurrentIndex(prev_index)
             self.status_bar.showMessage(f"Active tab: {self.tabs.tabText(prev_index)}", 2000)
 
+    def open_quick_switcher(self):
+        if self.quick_switcher is None:
+            self.quick_switcher = QuickSwitcher(self.manager.switch_index, self.manager.jump_to, self)
+        self.quick_switcher.popup()
+
+    def show_grouped_window(self, hwnd):
+        entry = self.registry.get(hwnd)
+        if not entry:
+            return
+        if self.overview.isVisible():
+            self.overview.close_overview()
+        if self.mode == 'tabs':
+            # Straight to the target; the tabs in between are never shown
+            self.tabs.setCurrentIndex(self.tab_index_of(hwnd))
+        else:
+            self.manager.switch_index.touch(hwnd)
+            entry.container.setFocus()
+        self.status_bar.showMessage(f"Active window: {entry.title}", 2000)
+
+    def toggle_overview(self):
+        if self.overview.isVisible():
+            self.overview.close_overview()
+            return
+        if not len(self.registry):
+            return
+        # The current tab is the one window whose content may have changed without a mark from a
+        # resize, a retitle or a mode switch; grid panes keep their snapshots until they get one
+        if self.mode == 'tabs' and self.host.current is not None:
+            self.manager.thumbnails.mark_dirty(self.host.current.hwnd)
+        windows = [(self.tabs.tabData(index), self.tabs.tabText(index)) for index in range(self.tabs.count())]
+        self.tabs.hide()
+        self.host.hide()
+        self.overview.show()
+        self.overview.open(windows)
+
+    def close_overview(self):
+        self.overview.hide()
+        self.host.show()
+        self.tabs.setVisible(self.mode == 'tabs')
+
     def toggle_always_on_top(self):
         self.is_always_on_top = not self.is_always_on_top
         self.always_on_top_action.setChecked(self.is_always_on_top)
         if self.is_always_on_top:
-            win32gui.SetWindowPos(int(self.winId()), win32con.HWND_TOPMOST, 0, 0, 0, 0,
-                                  win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+            self.backend.set_window_pos(int(self.winId()), HWND_TOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE)
         else:
-            win32gui.SetWindowPos(int(self.winId()), win32con.HWND_NOTOPMOST, 0, 0, 0, 0,
-                                  win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+            self.backend.set_window_pos(int(self.winId()), HWND_NOTOPMOST, 0, 0, 0, 0, SWP_NOMOVE | SWP_NOSIZE)
         status_text = "'Always on Top' mode enabled." if self.is_always_on_top else "'Always on Top' mode disabled."
         self.status_bar.showMessage(status_text, 3000)
 
@@ -292,195 +667,677 @@ class WindowGrouper(QMainWindow):
         window_geometry.moveCenter(center_point)
         self.move(window_geometry.topLeft())
 
-    def set_placeholder_tab(self):
-        if self.tabs.count() == 0:
-            placeholder_widget = QWidget()
-            layout = QVBoxLayout(placeholder_widget)
-            label = QLabel(
-                "Drag a window here to start grouping\n\nShortcuts:\nCtrl+Space: Next Tab (only when main window is active)\nCtrl+Shift+Space: Previous Tab\nCtrl+1/2: Switch Mode")
-            label.setAlignment(Qt.AlignCenter)
-            label.setStyleSheet("font-size: 16px; color: #888;")
-            layout.addWidget(label)
-            self.tabs.addTab(placeholder_widget, "Welcome")
+    def is_cursor_over_window(self, cursor_pos):
+        our_rect = self.geometry()
+        our_rect.moveTopLeft(self.pos())
+        return our_rect.contains(QPoint(cursor_pos[0], cursor_pos[1]))
 
-    def check_for_drag_drop(self):
-        try:
-            is_button_pressed = win32api.GetKeyState(win32con.VK_LBUTTON) < 0
-            if self.was_button_pressed and not is_button_pressed:
-                if self.dragged_window_hwnd:
-                    cursor_pos = win32gui.GetCursorPos()
-                    our_rect = self.geometry()
-                    our_rect.moveTopLeft(self.pos())
-                    if our_rect.contains(QPoint(cursor_pos[0], cursor_pos[1])):
-                        self.add_window_to_group(self.dragged_window_hwnd)
-                self.dragged_window_hwnd = None
-                self.setStyleSheet("")
-            elif is_button_pressed:
-                if not self.dragged_window_hwnd:
-                    cursor_pos = win32gui.GetCursorPos()
-                    hwnd_under_cursor = win32gui.WindowFromPoint(cursor_pos)
-                    while win32gui.GetParent(hwnd_under_cursor):
-                        hwnd_under_cursor = win32gui.GetParent(hwnd_under_cursor)
-
-                    title = win32gui.GetWindowText(hwnd_under_cursor)
-                    if "Window Grouper" in title or RESTORING_TITLE_PREFIX in title:
-                        return
-
-                    _, our_process_id = win32process.GetWindowThreadProcessId(int(self.winId()))
-                    _, cursor_process_id = win32process.GetWindowThreadProcessId(hwnd_under_cursor)
-                    if our_process_id == cursor_process_id or win32gui.IsChild(int(self.winId()), hwnd_under_cursor):
-                        return
-                    for i in range(self.tabs.count()):
-                        widget = self.tabs.widget(i)
-                        if hasattr(widget, 'hwnd') and widget.hwnd == hwnd_under_cursor:
-                            return
-                    if hwnd_under_cursor != int(self.winId()):
-                        self.dragged_window_hwnd = hwnd_under_cursor
-                        logging.info(f"Dragging window: '{title}' (handle: {hwnd_under_cursor})")
-                if self.dragged_window_hwnd:
-                    cursor_pos = win32gui.GetCursorPos()
-                    our_rect = self.geometry()
-                    our_rect.moveTopLeft(self.pos())
-                    if our_rect.contains(QPoint(cursor_pos[0], cursor_pos[1])):
-                        self.setStyleSheet("background-color: rgba(0, 200, 0, 50);")
-                    else:
-                        self.setStyleSheet("")
-            else:
-                if self.dragged_window_hwnd or self.styleSheet():
-                    self.dragged_window_hwnd = None
-                    self.setStyleSheet("")
-            self.was_button_pressed = is_button_pressed
-        except Exception as e:
-            logging.error(f"Error in drag detection: {e}")
-            self.dragged_window_hwnd = None
-            self.setStyleSheet("")
-            self.was_button_pressed = False
+    def set_drop_highlight(self, enabled):
+        style = "background-color: rgba(0, 200, 0, 50);" if enabled else ""
+        if self.styleSheet() != style:
+            self.setStyleSheet(style)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.manager.mark_active(self)
+        super().changeEvent(event)
 
     def add_window_to_group(self, hwnd):
-        if not win32gui.IsWindow(hwnd):
+        return hwnd in self.group_windows([hwnd])
+
+    def prepare_container(self, hwnd):
+        if not self.backend.is_window(hwnd):
             logging.error("Error: The window handle is no longer valid.")
-            return
-        title = win32gui.GetWindowText(hwnd)
+            return None
+        if hwnd in self.registry or hwnd in self.pending_embeds:
+            logging.info(f"Window {hwnd} is already grouped.")
+            return None
+        title = self.backend.get_text(hwnd)
         if not title:
             logging.error("Error: The window has no title.")
-            return
+            return None
         logging.info(f"Grouping window: '{title}'")
-        if self.mode == 'tabs' and self.tabs.count() == 1 and self.tabs.tabText(0) == "Welcome":
-            self.tabs.removeTab(0)
-        try:
-            container = ResizableContainer()
-            container.hwnd = hwnd
-            original_style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-            container.original_style = original_style
-            new_style = (original_style & ~win32con.WS_CAPTION) | win32con.WS_CHILD
-            SetWindowLongPtrW(hwnd, win32con.GWL_STYLE, new_style)
-            win32gui.SetParent(hwnd, int(container.winId()))
-            win32gui.ShowWindow(hwnd, win32con.SW_SHOW)
-            if self.mode == 'tabs':
-                self.add_widget_to_tab(container, title)
+        container = ResizableContainer(self.backend)
+        container.attach(hwnd)
+        self.pending_embeds[hwnd] = (container, title)
+        return container
+
+    def group_windows(self, hwnds, mode=None):
+        if mode == 'grid':
+            self.switch_to_grid_mode()
+        elif mode == 'tabs':
+            self.switch_to_tab_mode()
+        # Containers are created here; the calls into the other applications run on the worker pool
+        jobs = {}
+        for hwnd in hwnds:
+            container = self.prepare_container(hwnd)
+            if container:
+                jobs[hwnd] = int(container.winId())
+        if not jobs:
+            return []
+        pipeline = EmbedPipeline(jobs, self.backend, self.manager.embed_pool, EMBED_DEADLINE_MS)
+        self.active_embeds.append(pipeline)
+        pipeline.window_done.connect(lambda hwnd, outcome, details:
+                                     self.attach_embedded_window(pipeline, hwnd, outcome, details))
+        pipeline.finished.connect(lambda outcomes: self._on_embed_finished(pipeline, outcomes))
+        pipeline.start()
+        self.status_bar.showMessage(f"Grouping {len(jobs)} windows...")
+        return list(jobs)
+
+    def attach_embedded_window(self, pipeline, hwnd, outcome, details):
+        original_style, pid, seconds = details
+        if self.manager.metrics:
+            self.manager.metrics.record("EmbedPipeline.embed_window", seconds)
+            self.manager.metrics.record("EmbedPipeline.window_latency", pipeline.latency())
+        if hwnd in self.abandoned_embeds:
+            # Already reported as not grouped: a late success is undone rather than attached
+            container, title = self.abandoned_embeds.pop(hwnd)
+            if outcome == "embedded":
+                self.restore_entries([GroupedWindow(hwnd, container, original_style, title, pid)])
             else:
-                self.add_widget_to_splitter(container)
-            container.resized.connect(lambda: self.resize_embedded_window(container, hwnd))
-            self.resize_embedded_window(container, hwnd)
-            logging.info(f"Window '{title}' grouped successfully.")
-            self.status_bar.showMessage(f"Window '{title}' grouped.", 2000)
-        except Exception as e:
-            logging.error(f"CRITICAL ERROR embedding window '{title}': {e}")
+                self.release_container(hwnd, container, outcome)
+            return
+        container, title = self.pending_embeds.pop(hwnd)
+        if not pipeline.is_finished:
+            self.status_bar.showMessage(f"Grouping windows... {len(pipeline.outcomes)}/{len(pipeline.jobs)}")
+        if outcome != "embedded":
+            self.release_container(hwnd, container, outcome)
+            return
+        # Windows that finish within the same frame are attached together, with one relayout
+        if not self.ready_embeds:
+            QTimer.singleShot(16, self.flush_embeds)
+        self.ready_embeds.append((hwnd, container, title, original_style, pid))
 
-    def add_widget_to_tab(self, container, title=""):
-        title = title or win32gui.GetWindowText(container.hwnd)
-        index = self.tabs.addTab(container, title)
-        self.tabs.setCurrentIndex(index)
+    def flush_embeds(self):
+        ready, self.ready_embeds = self.ready_embeds, []
+        if not ready:
+            return
+        entries = [self.registry.add(hwnd, container, original_style, title, pid)
+                   for hwnd, container, title, original_style, pid in ready]
+        if self.close_restore or self.ready_to_close:
+            # The group closed while these windows were being embedded
+            for entry in entries:
+                self.registry.remove(entry.hwnd)
+            self.restore_entries(entries)
+            return
+        self.setUpdatesEnabled(False)
+        try:
+            self.host.add_containers([entry.container for entry in entries])
+            for entry in entries:
+                self.manager.window_grouped(self, entry)
+                self.add_widget_to_tab(entry.container, entry.title, activate=False)
+                container, hwnd = entry.container, entry.hwnd
+                container.resized.connect(lambda container=container, hwnd=hwnd:
+                                          self.resize_embedded_window(container, hwnd))
+                self.resize_embedded_window(container, hwnd)
+                logging.info(f"Window '{entry.title}' grouped successfully.")
+        finally:
+            self.setUpdatesEnabled(True)
 
-    @staticmethod
-    def resize_embedded_window(container, hwnd):
-        if win32gui.IsWindow(hwnd):
-            try:
-                rect = container.rect()
-                width, height = rect.width(), rect.height()
-                win32gui.MoveWindow(hwnd, 0, 0, width, height, True)
-            except Exception as e:
-                logging.error(f"Error resizing embedded window: {e}")
+    def _on_embed_finished(self, pipeline, outcomes):
+        self.active_embeds.remove(pipeline)
+        self.flush_embeds()
+        # A worker that never returned must not leave its window counted as grouped
+        for hwnd, outcome in outcomes.items():
+            if outcome == "timed out" and hwnd in self.pending_embeds:
+                container, title = self.pending_embeds.pop(hwnd)
+                container.hide()
+                self.abandoned_embeds[hwnd] = (container, title)
+        grouped = [hwnd for hwnd in pipeline.jobs if outcomes[hwnd] == "embedded" and hwnd in self.registry]
+        if grouped and self.mode == 'tabs':
+            self.tabs.setCurrentIndex(self.tab_index_of(grouped[-1]))
+        if len(pipeline.jobs) == 1:
+            title = self.registry.get(grouped[0]).title if grouped else ""
+            outcome = next(iter(outcomes.values()))
+            message = f"Window '{title}' grouped." if grouped else f"Window not grouped: {outcome}."
+        else:
+            message = f"Grouped {len(grouped)} of {len(pipeline.jobs)} windows."
+            not_responding = sum(1 for outcome in outcomes.values() if outcome == "not responding")
+            if not_responding:
+                message += f" {not_responding} not responding."
+        self.status_bar.showMessage(message, 3000)
 
-    def close_grouped_window(self, index):
-        container = None
-        if self.mode == 'tabs':
-            container = self.tabs.widget(index)
-            self.tabs.removeTab(index)
+    def add_widget_to_tab(self, container, title="", activate=True):
+        title = title or self.backend.get_text(container.hwnd)
+        index = self.tabs.addTab(title)
+        self.tabs.setTabData(index, container.hwnd)
+        self.tab_indexes[container.hwnd] = index
+        if activate:
+            self.tabs.setCurrentIndex(index)
+        elif self.tabs.count() == 1:
+            self.on_current_tab_changed(index)
 
-        if container and hasattr(container, 'hwnd'):
-            self.restore_window_from_widget(container)
+    def resize_embedded_window(self, container, hwnd):
+        rect = container.rect()
+        self.layout_scheduler.request(hwnd, rect.width(), rect.height())
+        self.manager.thumbnails.mark_dirty(hwnd)
 
-        if self.mode == 'tabs' and self.tabs.count() == 0:
-            self.set_placeholder_tab()
+    def close_grouped_window(self, index):
+        entry = self.registry.get(self.tabs.tabData(index))
+        if entry:
+            self.restore_window_from_widget(entry.container)
+        else:
+            self.remove_tab(index)
 
     def closeEvent(self, event):
-        logging.info("Closing application and restoring all windows...")
+        if self.ready_to_close:
+            event.accept()
+            return
+        # Windows are restored asynchronously; the window closes once the restore pipeline finishes
+        event.ignore()
+        if self.close_restore:
+            return
+        logging.info("Closing group window and restoring all windows...")
+        self.set_drop_highlight(False)
         original_title = self.windowTitle()
         restoring_title = f"{RESTORING_TITLE_PREFIX} {original_title}"
         self.setWindowTitle(restoring_title)
         logging.info(f"Changing title to '{restoring_title}' to prevent being 'stolen'.")
-        self.repaint()
-        time.sleep(0.2)
 
-        if self.mode == 'tabs':
-            for i in reversed(range(self.tabs.count())):
-                container = self.tabs.widget(i)
-                if hasattr(container, 'hwnd'):
-                    self.restore_window_from_widget(container)
-        else:  # grid
-            widgets_to_close = []
-            for i in range(self.grid_splitter.count()):
-                splitter = self.grid_splitter.widget(i)
-                for j in range(splitter.count()):
-                    widgets_to_close.append(splitter.widget(j))
-            for widget in widgets_to_close:
-                if hasattr(widget, 'hwnd'):
-                    self.restore_window_from_widget(widget)
-            self.clear_splitter()
-        event.accept()
+        self.background_policy.revert_all()
+        entries = list(reversed(self.registry.clear()))
+        for entry in entries:
+            self.manager.window_ungrouped(entry.hwnd)
+            self.layout_scheduler.forget(entry.hwnd)
+        self.close_restore = RestorePipeline(entries, self.backend)
+        self.close_restore.finished.connect(self._on_close_restore_finished)
+        self.close_restore.start()
+        self.status_bar.showMessage(f"Restoring {len(entries)} windows...")
+
+    def _on_close_restore_finished(self, outcomes):
+        self.ready_to_close = True
+        self.manager.windows_restored(outcomes)
+        self.manager.record_group_closed(self, outcomes)
+        self.manager.remove_group(self)
+        self.close()
 
     def restore_window_from_widget(self, widget):
         if not hasattr(widget, 'hwnd'):
-            return
-        hwnd = widget.hwnd
-        original_title = win32gui.GetWindowText(hwnd)
-        temp_title = f"{RESTORING_TITLE_PREFIX} {original_title}"
+            return None
+        entry = self.registry.remove(widget.hwnd)
+        self.layout_scheduler.forget(widget.hwnd)
+        if not entry:
+            return None
+        self.background_policy.forget(entry)
+        index = self.tab_index_of(entry.hwnd)
+        if index >= 0:
+            self.remove_tab(index)
+        self.host.remove_container(entry.container)
+        return self.restore_entries([entry])
 
-        try:
-            win32gui.SetWindowText(hwnd, temp_title)
-            logging.info(f"Restoring '{original_title}' (temporary title: '{temp_title}')")
+    def ungroup_all(self):
+        self.background_policy.revert_all()
+        entries = self.registry.clear()
+        if not entries:
+            return 0
+        for entry in entries:
+            self.layout_scheduler.forget(entry.hwnd)
+            self.host.remove_container(entry.container)
+        while self.tabs.count():
+            self.tabs.removeTab(self.tabs.count() - 1)
+        self.tab_indexes.clear()
+        self.restore_entries(entries)
+        self.status_bar.showMessage(f"Restoring {len(entries)} windows...", 2000)
+        return len(entries)
 
-            if hasattr(widget, 'original_style'):
-                SetWindowLongPtrW(hwnd, win32con.GWL_STYLE, widget.original_style)
-            win32gui.SetParent(hwnd, None)
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-            win32gui.SetWindowPos(hwnd, None, 100, 100, 800, 600, win32con.SWP_NOZORDER | win32con.SWP_FRAMECHANGED)
+    def restore_entries(self, entries):
+        for entry in entries:
+            self.manager.window_ungrouped(entry.hwnd)
+            entry.container.forwarder.detach()
+        pipeline = RestorePipeline(entries, self.backend)
+        self.active_restores.append(pipeline)
+        pipeline.finished.connect(lambda outcomes: self._on_restore_finished(pipeline, entries, outcomes))
+        pipeline.start()
+        return pipeline
 
-            time.sleep(0.2)
-            win32gui.SetWindowText(hwnd, original_title)
-            logging.info(f"Title restored to '{original_title}'")
+    def _on_restore_finished(self, pipeline, entries, outcomes):
+        self.active_restores.remove(pipeline)
+        self.manager.windows_restored(outcomes)
+        for entry in entries:
+            if outcomes.get(entry.hwnd) in ("restored", "gone"):
+                self.manager.record_session('remove', hwnd=entry.hwnd)
+            self.release_container(entry.hwnd, entry.container, outcomes.get(entry.hwnd))
 
-        except Exception as e:
-            logging.error(f"Error restoring window: {e}")
+    def release_container(self, hwnd, container, outcome):
+        # Destroying a container destroys a window still parented to it. A timed out or failed
+        # restore may have left the window inside, so such containers are only hidden.
+        if outcome not in ("restored", "gone"):
             try:
-                win32gui.SetWindowText(hwnd, original_title)
-            except:
-                pass
+                still_inside = self.backend.get_parent(hwnd) == int(container.winId())
+            except Exception:
+                still_inside = False  # the window is gone
+            if still_inside:
+                container.hide()
+                return
+        container.deleteLater()
+
+    def remove_dead_window(self, hwnd):
+        entry = self.registry.remove(hwnd)
+        if not entry:
+            return
+        self.manager.window_ungrouped(hwnd)
+        self.layout_scheduler.forget(hwnd)
+        self.background_policy.forget(entry)
+        entry.container.forwarder.detach()
+        index = self.tab_index_of(hwnd)
+        if index >= 0:
+            self.remove_tab(index)
+        self.host.remove_container(entry.container)
+        entry.container.deleteLater()
+        self.manager.record_session('remove', hwnd=hwnd)
+        self.status_bar.showMessage(f"'{entry.title}' was closed.", 2000)
+
+    def update_titles(self, titles):
+        changed = [(hwnd, title) for hwnd, title in titles.items() if title and hwnd in self.registry]
+        if not changed:
+            return
+        # Every rename of the frame lands in a single tab bar repaint
+        self.tabs.setUpdatesEnabled(False)
+        try:
+            for hwnd, title in changed:
+                self.registry.get(hwnd).title = title
+                self.manager.switch_index.update_title(hwnd, title)
+                self.manager.thumbnails.mark_dirty(hwnd)
+                if hwnd in self.tab_indexes:
+                    self.tabs.setTabText(self.tab_indexes[hwnd], title)
+                self.manager.record_title(hwnd, title)
+        finally:
+            self.tabs.setUpdatesEnabled(True)
 
     def create_new_group_window(self):
         logging.info("Request to create a new group window.")
-        self.status_bar.showMessage("Creating new window...", 2000)
         try:
-            QTimer.singleShot(100, lambda: subprocess.Popen([sys.executable, "codigo.py"]))
-            logging.info("Command for new window sent.")
+            self.manager.create_group()
         except Exception as e:
             logging.error(f"Could not create a new window: {e}")
             self.status_bar.showMessage("Error creating new window.", 3000)
 
 
+# --- Group manager ---
+# Hosts every group window of the process and owns the single drag event source.
+# Each drop is routed to the most recently active group under the cursor.
+class GroupManager:
+    def __init__(self, drag_source=None, window_source=None, rule_engine=None, background_allow_list=(),
+                 session=None, backend=None, thumbnail_cache_bytes=THUMBNAIL_CACHE_BYTES,
+                 embed_workers=EMBED_WORKERS):
+        self.backend = backend or Win32WindowBackend()
+        self.groups = []
+        self.session = session
+        self.session_replacements = {}  # live hwnd -> hwnd of the saved record it re-attaches
+        self.pending_titles = {}  # hwnd -> latest title not journaled yet
+        self.metrics = None
+        self.background_allow_list = background_allow_list
+        self.next_group_number = 1
+        self.dragged_window_hwnd = None
+        self.our_process_id = os.getpid()
+
+        # Top-level windows are enumerated once, then tracked from lifecycle events
+        self.rule_engine = rule_engine or RuleEngine()
+        self.auto_grouped = set()
+        self.window_index = WindowIndex(self.backend.describe_window)
+        self.window_index.subscribe(self.on_window_indexed)
+        self.window_index.rebuild(self.backend.enum_windows())
+        # Grouped windows are reaped on destroy notifications, with process exits as the fallback
+        self.process_exit_relay = ProcessExitRelay()
+        self.process_watcher = ProcessExitWatcher(self.process_exit_relay.exited.emit)
+        self.lifecycle = WindowLifecycle(lambda delay, callback: QTimer.singleShot(delay, callback),
+                                         self.backend.is_window, self.backend.get_text,
+                                         self.on_window_dead, self.on_windows_retitled, self.process_watcher)
+        self.process_exit_relay.exited.connect(self.lifecycle.process_exited)
+        self.switch_index = SwitchIndex()
+        self.thumbnails = ThumbnailCache(self.backend.capture_window, thumbnail_cache_bytes)
+        # Captures wait on the captured application, so they have their own small pool
+        self.capture_pool = WorkerPool(THUMBNAIL_WORKERS, "thumbnail-worker")
+        self.thumbnail_capturer = ThumbnailCapturer(self.thumbnails, self.capture_pool.submit)
+        self.embed_pool = WorkerPool(embed_workers)
+
+        self.window_source = window_source or WinEventWindowSource()
+        self.window_source.subscribe(self.window_index)
+        self.window_source.subscribe(self.lifecycle)
+        self.window_source.start()
+
+        # Only runs while a window is being dragged, to update the drop highlight
+        self.drag_timer = QTimer()
+        self.drag_timer.timeout.connect(self.check_for_drag_drop)
+
+        self.drag_source = drag_source or WinEventDragSource()
+        self.drag_source.start(self.on_drag_started, self.on_drag_finished)
+
+    def create_group(self, name=None):
+        if name and self.find_group(name):
+            return self.find_group(name)
+        started = time.perf_counter()
+        number = self.next_group_number
+        self.next_group_number += 1
+        # Restored sessions may already use some numbers as names
+        while not name and self.find_group(str(number)):
+            number = self.next_group_number
+            self.next_group_number += 1
+        group = WindowGrouper(self, name or str(number), self.background_allow_list)
+        if self.groups:
+            # Cascade new groups so they do not open exactly on top of each other
+            offset = 30 * (len(self.groups) % 10)
+            group.move(group.pos() + QPoint(offset, offset))
+        self.groups.insert(0, group)
+        group.show()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        rss_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+        logging.info(f"Group '{group.name}' opened in {elapsed_ms:.1f} ms "
+                     f"({len(self.groups)} groups, process RSS {rss_mb:.1f} MB)")
+        self.record_session('group', group=group.name, mode=group.mode, layout=group.host.tiling.kind)
+        return group
+
+    def remove_group(self, group):
+        if group in self.groups:
+            self.groups.remove(group)
+        if not self.groups:
+            self.drag_source.stop()
+            self.window_source.stop()
+            self.process_watcher.stop()
+            self.reset_drag_state()
+            if self.session:
+                self.flush_session_titles()
+                self.session.close()
+            if self.metrics:
+                self.metrics_timer.stop()
+                self.loop_lag_probe.stop()
+                self.metrics.export(self.metrics_path)
+
+    def mark_active(self, group):
+        if self.groups and self.groups[0] is not group and group in self.groups:
+            self.groups.remove(group)
+            self.groups.insert(0, group)
+
+    def find_group(self, name):
+        for group in self.groups:
+            if group.name == name:
+                return group
+        return None
+
+    def find_group_for_window(self, hwnd):
+        for group in self.groups:
+            if hwnd in group.registry or hwnd in group.pending_embeds:
+                return group
+        return None
+
+    def group_at(self, cursor_pos):
+        # Groups are kept in activation order, so the first match is the one on top
+        for group in self.groups:
+            if group.isVisible() and not group.close_restore and group.is_cursor_over_window(cursor_pos):
+                return group
+        return None
+
+    # --- Control API (see control.py) ---
+    def list_windows(self):
+        windows = []
+        for window in self.window_index.visible_windows():
+            if window.pid == self.our_process_id or RESTORING_TITLE_PREFIX in window.title:
+                continue
+            if self.find_group_for_window(window.hwnd):
+                continue
+            windows.append(window.as_dict())
+        return windows
+
+    def group_windows(self, group_name, hwnds, mode=None):
+        group = self.create_group(group_name) if group_name else (self.groups[0] if self.groups else self.create_group())
+        hwnds = [hwnd for hwnd in hwnds if not self.find_group_for_window(hwnd)]
+        return group.group_windows(hwnds, mode)
+
+    def ungroup_all(self, group_name=None):
+        groups = [self.find_group(group_name)] if group_name else list(self.groups)
+        return sum(group.ungroup_all() for group in groups if group)
+
+    def describe_groups(self):
+        return [{"name": group.name, "mode": group.mode,
+                 "windows": [{"hwnd": entry.hwnd, "title": entry.title, "pid": entry.pid} for entry in group.registry]}
+                for group in self.groups]
+
+    # --- Grouped window bookkeeping ---
+    # Every window that enters or leaves a group is tracked for lifecycle events, indexed for
+    # the quick switcher and journaled.
+    def window_grouped(self, group, entry):
+        window = self.window_index.get(entry.hwnd)
+        if window:
+            process, class_name = window.process, window.class_name
+        else:
+            process, class_name = read_process_info(entry.pid)[0], self.backend.get_class_name(entry.hwnd)
+        self.lifecycle.track(entry.hwnd, entry.pid)
+        self.switch_index.add(entry.hwnd, group.name, entry.title, process)
+        self.record_session('add', group=group.name, hwnd=entry.hwnd, pid=entry.pid, process=process,
+                            class_name=class_name, title=entry.title, style=entry.original_style,
+                            replaces=self.session_replacements.pop(entry.hwnd, None))
+
+    def window_ungrouped(self, hwnd):
+        self.lifecycle.untrack(hwnd)
+        self.switch_index.remove(hwnd)
+        self.thumbnail_capturer.forget(hwnd)
+
+    def windows_restored(self, outcomes):
+        # A window renamed while embedded (the restore title does it) dropped out of the index
+        # as a child window; it is top-level again now. Rules leave it alone, like any window
+        # ungrouped by hand.
+        for hwnd, outcome in outcomes.items():
+            if outcome == "restored":
+                self.auto_grouped.add(hwnd)
+                self.window_index.window_created(hwnd)
+
+    # --- Quick switcher (see quick_switch.py) ---
+    def jump_to(self, hwnd):
+        group = self.find_group_for_window(hwnd)
+        if not group:
+            return
+        if group.isMinimized():
+            group.showNormal()
+        group.raise_()
+        group.activateWindow()
+        group.show_grouped_window(hwnd)
+
+    # --- Window lifecycle (see window_lifecycle.py) ---
+    def on_window_dead(self, hwnd):
+        group = self.find_group_for_window(hwnd)
+        if group:
+            group.remove_dead_window(hwnd)
+
+    def on_windows_retitled(self, titles):
+        for group in self.groups:
+            group.update_titles(titles)
+
+    # --- Instrumentation (see metrics.py) ---
+    def enable_metrics(self, metrics, path=METRICS_PATH, export_seconds=10):
+        self.metrics = metrics
+        self.metrics_path = path
+        self.metrics_export_ticks = max(1, export_seconds)
+        self.metrics_ticks = 0
+        self.loop_lag_probe = LoopLagProbe(metrics, lambda delay, callback: QTimer.singleShot(delay, callback))
+        self.loop_lag_probe.start()
+        self.metrics_timer = QTimer()
+        self.metrics_timer.timeout.connect(self.refresh_metrics)
+        self.metrics_timer.start(1000)
+
+    def refresh_metrics(self):
+        summary = self.metrics.summary()
+        for group in self.groups:
+            group.metrics_label.setText(summary)
+            group.metrics_label.show()
+        self.metrics_ticks += 1
+        if self.metrics_ticks % self.metrics_export_ticks == 0:
+            self.metrics.export(self.metrics_path)
+
+    # --- Session journal (see session.py) ---
+    def record_session(self, kind, **fields):
+        if self.session:
+            self.session.record(kind, **fields)
+
+    def record_title(self, hwnd, title):
+        # Browsers and terminals retitle constantly; only the latest title of each window is
+        # journaled, every few seconds, so renames cost no disk writes on the GUI thread
+        if not self.session:
+            return
+        if not self.pending_titles:
+            QTimer.singleShot(SESSION_TITLE_FLUSH_MS, self.flush_session_titles)
+        self.pending_titles[hwnd] = title
+
+    def flush_session_titles(self):
+        titles, self.pending_titles = self.pending_titles, {}
+        for hwnd, title in titles.items():
+            self.record_session('title', hwnd=hwnd, title=title)
+
+    def record_group_closed(self, group, outcomes):
+        if any(other is not group for other in self.groups):
+            self.record_session('close_group', group=group.name)
+            return
+        # Closing the last group ends the session: its windows stay in the workspace for the next start
+        for hwnd, outcome in outcomes.items():
+            if outcome == "restored":
+                self.record_session('release', hwnd=hwnd)
+            elif outcome == "gone":
+                self.record_session('remove', hwnd=hwnd)
+
+    def restore_session(self, state):
+        started = time.perf_counter()
+        candidates = [window for window in self.window_index.visible_windows()
+                      if window.pid != self.our_process_id and RESTORING_TITLE_PREFIX not in window.title]
+        matched = {id(record): window.hwnd for record, window in match_saved_windows(state.records(), candidates)}
+        grouped = 0
+        # The journal applies new ops to the same state, so iterate over copies
+        for name, saved in list(state.groups.items()):
+            # Creating the group journals its default mode and layout over the saved ones
+            mode, layout = saved["mode"], saved["layout"]
+            group = self.create_group(name)
+            group.set_grid_layout(layout)
+            hwnds = []
+            for record in list(saved["windows"].values()):
+                if id(record) in matched:
+                    hwnds.append(matched[id(record)])
+                    self.session_replacements[matched[id(record)]] = record["hwnd"]
+            grouped += len(group.group_windows(hwnds, mode))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logging.info(f"Session restored in {elapsed_ms:.0f} ms: {grouped}/{len(state.records())} windows "
+                     f"being re-attached to {len(state.groups)} groups.")
+        return grouped
+
+    # --- Auto-grouping ---
+    def on_window_indexed(self, kind, window):
+        if kind == 'removed':
+            if not self.backend.is_window(window.hwnd):
+                self.auto_grouped.discard(window.hwnd)
+            return
+        if not len(self.rule_engine) or not window.visible or not window.title:
+            return
+        # Each window is auto-grouped at most once, so ungrouping it by hand sticks
+        if window.hwnd in self.auto_grouped or window.pid == self.our_process_id:
+            return
+        if RESTORING_TITLE_PREFIX in window.title or self.find_group_for_window(window.hwnd):
+            return
+        started = time.perf_counter()
+        rule = self.rule_engine.match(window)
+        logging.debug(f"Rules evaluated for '{window.title}' in {(time.perf_counter() - started) * 1e6:.0f} us")
+        if rule:
+            self.auto_grouped.add(window.hwnd)
+            logging.info(f"Rule {rule} matched '{window.title}'. Grouping into '{rule.group}'.")
+            # Group outside the event hook callback
+            QTimer.singleShot(0, lambda: self.group_windows(rule.group, [window.hwnd], rule.mode))
+
+    def on_drag_started(self, hwnd, cursor_pos):
+        try:
+            title = self.backend.get_text(hwnd)
+            if "Window Grouper" in title or RESTORING_TITLE_PREFIX in title:
+                return
+
+            drag_process_id = self.backend.get_window_pid(hwnd)
+            if drag_process_id == self.our_process_id or self.find_group_for_window(hwnd):
+                return
+            self.dragged_window_hwnd = hwnd
+            logging.info(f"Dragging window: '{title}' (handle: {hwnd})")
+            self.drag_timer.start(50)
+        except Exception as e:
+            logging.error(f"Error in drag detection: {e}")
+            self.reset_drag_state()
+
+    def on_drag_finished(self, hwnd, cursor_pos):
+        try:
+            if self.dragged_window_hwnd and hwnd == self.dragged_window_hwnd:
+                group = self.group_at(cursor_pos)
+                if group:
+                    # Embed outside the event hook callback
+                    QTimer.singleShot(0, lambda: group.add_window_to_group(hwnd))
+        except Exception as e:
+            logging.error(f"Error in drag detection: {e}")
+        self.reset_drag_state()
+
+    def check_for_drag_drop(self):
+        if not self.dragged_window_hwnd:
+            self.reset_drag_state()
+            return
+        try:
+            target = self.group_at(self.backend.get_cursor_pos())
+            for group in self.groups:
+                group.set_drop_highlight(group is target)
+        except Exception as e:
+            logging.error(f"Error in drag detection: {e}")
+            self.reset_drag_state()
+
+    def reset_drag_state(self):
+        self.drag_timer.stop()
+        self.dragged_window_hwnd = None
+        for group in self.groups:
+            group.set_drop_highlight(False)
+
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = WindowGrouper()
-    window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Group application windows into tabs or a grid.")
+    parser.add_argument("--groups", type=int, default=1, help="number of group windows to open at startup")
+    parser.add_argument("--rules", default="grouping_rules.json", help="JSON file with auto-grouping rules")
+    parser.add_argument("--keep-running", default="",
+                        help="comma-separated executables never hidden or throttled in background tabs")
+    parser.add_argument("--log-json", metavar="PATH", help="also write structured JSON-lines logs to PATH")
+    parser.add_argument("--session", default=SESSION_PATH, help="session journal file")
+    parser.add_argument("--thumbnail-cache-mb", type=int, default=THUMBNAIL_CACHE_BYTES // (1024 * 1024),
+                        help="memory cap of the window snapshots used by the overview and tab previews")
+    parser.add_argument("--no-restore", action="store_true", help="do not re-attach the windows of the last session")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_PATH, metavar="PATH",
+                        help=f"time hot paths, count Win32 calls and export them to PATH (default {METRICS_PATH})")
+    parser.add_argument("--metrics-interval", type=int, default=10, help="seconds between metrics exports")
+    parser.add_argument("--debug", action="store_true", help="log debug messages")
+    args, qt_args = parser.parse_known_args()
+
+    # --- Logging Configuration ---
+    configure_logging(level=logging.DEBUG if args.debug else logging.INFO, json_path=args.log_json)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    rule_engine = RuleEngine.load(args.rules) if os.path.exists(args.rules) else RuleEngine()
+    allow_list = [name for name in args.keep_running.split(",") if name.strip()]
+
+    backend = Win32WindowBackend()
+
+    # Instrumentation wraps the hot paths only when asked for; otherwise they run untouched
+    metrics = None
+    if args.metrics:
+        metrics = Metrics()
+        metrics.instrument(WindowGrouper, ["group_windows", "flush_embeds", "resize_embedded_window",
+                                           "restore_window_from_widget", "set_mode"])
+        metrics.instrument(GroupManager, ["check_for_drag_drop"])
+        metrics.count_calls(backend, "win32", WindowBackend.WIN32_CALLS)
+
+    # Windows left embedded by a crash are restored before they are indexed
+    journal = SessionJournal(args.session)
+    saved_session = journal.load()
+    if not saved_session.clean_exit:
+        logging.warning("The previous session did not shut down cleanly.")
+    recover_orphaned_windows(saved_session, backend)
+
+    manager = GroupManager(rule_engine=rule_engine, background_allow_list=allow_list, session=journal,
+                           backend=backend, thumbnail_cache_bytes=args.thumbnail_cache_mb * 1024 * 1024)
+    if metrics:
+        manager.enable_metrics(metrics, args.metrics, args.metrics_interval)
+    # Saved windows that are not re-attached now are kept for the next start
+    journal.start(saved_session)
+    startup_started = time.perf_counter()
+    if saved_session.groups and not args.no_restore:
+        manager.restore_session(saved_session)
+    while len(manager.groups) < max(1, args.groups):
+        manager.create_group()
+    logging.info(f"Opened {len(manager.groups)} groups in {(time.perf_counter() - startup_started) * 1000:.1f} ms.")
+    control_server = ControlServer(manager)
+    control_server.start()
+    sys.exit(app.exec_())
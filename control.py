@@ -0,0 +1,138 @@
+import json
+import logging
+import re
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+# --- Constants ---
+CONTROL_SERVER_NAME = "window-grouper-control"
+CONTROL_TIMEOUT_MS = 5000
+VALID_MODES = ('tabs', 'grid')
+
+
+# --- Command handling ---
+# The target is the object that owns the groups (GroupManager in the app). It must provide
+# list_windows(), group_windows(group_name, hwnds, mode), ungroup_all(group_name) and describe_groups().
+def match_windows(windows, process=None, title_pattern=None):
+    process = process.lower() if process else None
+    if process and not process.endswith(".exe"):
+        process += ".exe"
+    matches = []
+    for window in windows:
+        if process and (window.get("process") or "").lower() != process:
+            continue
+        if title_pattern and not title_pattern.search(window.get("title") or ""):
+            continue
+        matches.append(window)
+    return matches
+
+
+def execute_command(request, target):
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "Request must be a JSON object."}
+    command = request.get("command")
+    group_name = request.get("group")
+    if group_name is not None:
+        group_name = str(group_name)
+
+    if command == "list":
+        return {"ok": True, "groups": target.describe_groups()}
+
+    if command == "group":
+        process = request.get("process")
+        title = request.get("title")
+        mode = request.get("mode")
+        if not process and not title:
+            return {"ok": False, "error": "'group' needs a 'process' or a 'title' pattern."}
+        if mode is not None and mode not in VALID_MODES:
+            return {"ok": False, "error": f"Unknown mode: {mode!r}"}
+        try:
+            title_pattern = re.compile(title, re.IGNORECASE) if title else None
+        except re.error as e:
+            return {"ok": False, "error": f"Invalid title pattern: {e}"}
+        windows = match_windows(target.list_windows(), process, title_pattern)
+        grouped = target.group_windows(group_name, [window["hwnd"] for window in windows], mode)
+        return {"ok": True, "matched": len(windows), "grouped": grouped}
+
+    if command == "ungroup":
+        return {"ok": True, "ungrouped": target.ungroup_all(group_name)}
+
+    return {"ok": False, "error": f"Unknown command: {command!r}"}
+
+
+# --- Local control server ---
+# One JSON request per line in, one JSON response per line out (a named pipe on Windows).
+class ControlServer(QObject):
+    def __init__(self, target, name=CONTROL_SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.target = target
+        self.name = name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+        self.buffers = {}
+
+    def start(self):
+        if not self.server.listen(self.name):
+            # A previous instance may have crashed and left the endpoint behind
+            QLocalServer.removeServer(self.name)
+            if not self.server.listen(self.name):
+                logging.error(f"Could not start control server '{self.name}': {self.server.errorString()}")
+                return False
+        logging.info(f"Control server listening on '{self.name}'.")
+        return True
+
+    def stop(self):
+        self.server.close()
+        self.buffers.clear()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_disconnected(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        data = self.buffers.get(socket, b"") + bytes(socket.readAll())
+        *lines, rest = data.split(b"\n")
+        self.buffers[socket] = rest
+        for line in lines:
+            if line.strip():
+                socket.write(json.dumps(self.handle_line(line)).encode("utf-8") + b"\n")
+        socket.flush()
+
+    def handle_line(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"ok": False, "error": f"Invalid JSON: {e}"}
+        logging.info(f"Control command: {request}")
+        try:
+            return execute_command(request, self.target)
+        except Exception as e:
+            logging.error(f"Error executing control command {request}: {e}")
+            return {"ok": False, "error": str(e)}
+
+
+# --- Client side ---
+def send_request(request, name=CONTROL_SERVER_NAME, timeout_ms=CONTROL_TIMEOUT_MS):
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(timeout_ms):
+        raise ConnectionError(f"Could not connect to '{name}': {socket.errorString()}")
+    try:
+        socket.write(json.dumps(request).encode("utf-8") + b"\n")
+        socket.flush()
+        data = b""
+        while not data.endswith(b"\n"):
+            if not socket.waitForReadyRead(timeout_ms):
+                raise TimeoutError(f"No response from '{name}'")
+            data += bytes(socket.readAll())
+        return json.loads(data)
+    finally:
+        socket.disconnectFromServer()
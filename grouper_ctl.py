@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+
+from PyQt5.QtCore import QCoreApplication
+
+from control import CONTROL_SERVER_NAME, send_request
+
+
+# --- Command-line client for the running Window Grouper ---
+# Examples:
+#   python grouper_ctl.py list
+#   python grouper_ctl.py group --process putty --group ops --mode grid
+#   python grouper_ctl.py group --title "^Monitor" --group ops
+#   python grouper_ctl.py ungroup --group ops
+def build_parser():
+    parser = argparse.ArgumentParser(description="Control a running Window Grouper.")
+    parser.add_argument("--server", default=CONTROL_SERVER_NAME, help="control server name")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list groups and their windows")
+
+    group = commands.add_parser("group", help="group every matching window in one batch")
+    group.add_argument("--process", help="executable name, e.g. putty or putty.exe")
+    group.add_argument("--title", help="regular expression searched in window titles")
+    group.add_argument("--group", help="target group (created if it does not exist)")
+    group.add_argument("--mode", choices=["tabs", "grid"], help="switch the group to this mode")
+
+    ungroup = commands.add_parser("ungroup", help="restore all grouped windows")
+    ungroup.add_argument("--group", help="only this group (default: all groups)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    request = {key: value for key, value in vars(args).items() if key != "server" and value is not None}
+    app = QCoreApplication(sys.argv[:1])
+    try:
+        response = send_request(request, name=args.server)
+    except (ConnectionError, TimeoutError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(response, indent=2))
+    return 0 if response.get("ok") else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
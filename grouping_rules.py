@@ -0,0 +1,84 @@
+import json
+import logging
+import re
+
+
+# --- Auto-grouping rules ---
+# A rule sends matching windows to a group. Every condition that is set must match:
+# executable name, window class and a title regular expression.
+class GroupingRule:
+    __slots__ = ('group', 'process', 'class_name', 'title_pattern', 'mode', 'order')
+
+    def __init__(self, group, process=None, class_name=None, title=None, mode=None):
+        if not (process or class_name or title):
+            raise ValueError("A grouping rule needs a process, a class or a title pattern")
+        process = process.lower() if process else None
+        if process and not process.endswith(".exe"):
+            process += ".exe"
+        self.group = str(group)
+        self.process = process
+        self.class_name = class_name
+        self.title_pattern = re.compile(title, re.IGNORECASE) if title else None
+        self.mode = mode
+        self.order = 0
+
+    def matches(self, window):
+        if self.process and (window.process or "").lower() != self.process:
+            return False
+        if self.class_name and window.class_name != self.class_name:
+            return False
+        if self.title_pattern and not self.title_pattern.search(window.title or ""):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"GroupingRule(group={self.group!r}, process={self.process!r}, class_name={self.class_name!r})"
+
+
+class RuleEngine:
+    def __init__(self, rules=()):
+        # Rules are bucketed by their most selective exact key, so a new window is only
+        # checked against rules that can possibly match it
+        self.by_process = {}
+        self.by_class = {}
+        self.by_title = []
+        self.count = 0
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        rule.order = self.count
+        self.count += 1
+        if rule.process:
+            self.by_process.setdefault(rule.process, []).append(rule)
+        elif rule.class_name:
+            self.by_class.setdefault(rule.class_name, []).append(rule)
+        else:
+            self.by_title.append(rule)
+
+    def match(self, window):
+        candidates = (self.by_process.get((window.process or "").lower(), []) +
+                      self.by_class.get(window.class_name, []) + self.by_title)
+        best = None
+        for rule in candidates:
+            if (best is None or rule.order < best.order) and rule.matches(window):
+                best = rule
+        return best
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def load(cls, path):
+        # [{"group": "ops", "process": "putty", "title": "^prod", "class": "PuTTY", "mode": "grid"}, ...]
+        with open(path, encoding="utf-8") as rules_file:
+            data = json.load(rules_file)
+        engine = cls()
+        for item in data:
+            try:
+                engine.add_rule(GroupingRule(item["group"], item.get("process"), item.get("class"),
+                                             item.get("title"), item.get("mode")))
+            except (KeyError, ValueError, re.error) as e:
+                logging.error(f"Ignoring invalid grouping rule {item}: {e}")
+        logging.info(f"Loaded {len(engine)} grouping rules from '{path}'.")
+        return engine
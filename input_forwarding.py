@@ -0,0 +1,236 @@
+import logging
+import time
+
+from PyQt5.QtCore import Qt
+
+# --- Window messages ---
+WM_SETFOCUS = 0x0007
+WM_MOUSEACTIVATE = 0x0021
+WM_KEYDOWN = 0x0100
+WM_KEYUP = 0x0101
+WM_CHAR = 0x0102
+WM_SYSKEYDOWN = 0x0104
+WM_SYSKEYUP = 0x0105
+WM_MOUSEMOVE = 0x0200
+WM_LBUTTONDOWN = 0x0201
+WM_LBUTTONUP = 0x0202
+WM_RBUTTONDOWN = 0x0204
+WM_RBUTTONUP = 0x0205
+WM_MBUTTONDOWN = 0x0207
+WM_MBUTTONUP = 0x0208
+WM_MOUSEWHEEL = 0x020A
+WM_MOUSEHWHEEL = 0x020E
+HTCLIENT = 1
+MK_LBUTTON = 0x0001
+MK_RBUTTON = 0x0002
+MK_SHIFT = 0x0004
+MK_CONTROL = 0x0008
+MK_MBUTTON = 0x0010
+
+# --- Prebuilt translation tables ---
+BUTTON_MESSAGES = {
+    Qt.LeftButton: (WM_LBUTTONDOWN, WM_LBUTTONUP),
+    Qt.RightButton: (WM_RBUTTONDOWN, WM_RBUTTONUP),
+    Qt.MiddleButton: (WM_MBUTTONDOWN, WM_MBUTTONUP),
+}
+BUTTON_STATE = ((Qt.LeftButton, MK_LBUTTON), (Qt.RightButton, MK_RBUTTON), (Qt.MiddleButton, MK_MBUTTON))
+MODIFIER_STATE = ((Qt.ShiftModifier, MK_SHIFT), (Qt.ControlModifier, MK_CONTROL))
+
+KEY_MAP = {
+    Qt.Key_Enter: 0x0D, Qt.Key_Return: 0x0D, Qt.Key_Escape: 0x1B, Qt.Key_Tab: 0x09, Qt.Key_Backtab: 0x09,
+    Qt.Key_Backspace: 0x08, Qt.Key_Delete: 0x2E, Qt.Key_Insert: 0x2D, Qt.Key_Space: 0x20,
+    Qt.Key_Left: 0x25, Qt.Key_Up: 0x26, Qt.Key_Right: 0x27, Qt.Key_Down: 0x28,
+    Qt.Key_Home: 0x24, Qt.Key_End: 0x23, Qt.Key_PageUp: 0x21, Qt.Key_PageDown: 0x22,
+    Qt.Key_Shift: 0x10, Qt.Key_Control: 0x11, Qt.Key_Alt: 0x12, Qt.Key_Meta: 0x5B,
+    Qt.Key_CapsLock: 0x14, Qt.Key_NumLock: 0x90, Qt.Key_ScrollLock: 0x91,
+    Qt.Key_Pause: 0x13, Qt.Key_Print: 0x2C, Qt.Key_Menu: 0x5D,
+}
+KEY_MAP.update({Qt.Key_F1 + i: 0x70 + i for i in range(24)})
+KEY_MAP.update({Qt.Key_0 + i: 0x30 + i for i in range(10)})
+KEY_MAP.update({Qt.Key_A + i: 0x41 + i for i in range(26)})
+
+
+def make_lparam(x, y):
+    return ((y & 0xFFFF) << 16) | (x & 0xFFFF)
+
+
+def mouse_key_state(buttons, modifiers):
+    state = 0
+    for button, flag in BUTTON_STATE:
+        if buttons & button:
+            state |= flag
+    for modifier, flag in MODIFIER_STATE:
+        if modifiers & modifier:
+            state |= flag
+    return state
+
+
+def key_lparam(scan_code, is_release, is_repeat, alt_down):
+    lparam = 1 | ((scan_code & 0xFF) << 16)
+    if alt_down:
+        lparam |= 1 << 29
+    if is_repeat or is_release:
+        lparam |= 1 << 30
+    if is_release:
+        lparam |= 1 << 31
+    return lparam
+
+
+# --- Forwarder ---
+# Translates Qt input events of a container into messages posted to the embedded window.
+# The child's client origin is cached until the container moves or resizes, mouse moves are
+# coalesced to the latest position per frame, and a failed post marks the window as gone
+# instead of checking IsWindow on every event.
+class InputForwarder:
+    def __init__(self, post_message, schedule, origin_provider, frame_ms=16):
+        self.post_message = post_message
+        self.schedule = schedule  # schedule(delay_ms, callback)
+        self.origin_provider = origin_provider  # origin_provider(hwnd) -> (x, y) of the child in container coordinates
+        self.frame_ms = frame_ms
+        self.hwnd = None
+        self.alive = False
+        self.origin = None
+        self.pending_move = None
+        self.frame_scheduled = False
+        self.event_count = 0
+        self.coalesced_count = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def attach(self, hwnd):
+        self.hwnd = hwnd
+        self.alive = True
+        self.origin = None
+
+    def detach(self):
+        self.alive = False
+        self.pending_move = None
+
+    def invalidate_origin(self):
+        self.origin = None
+
+    def to_child(self, pos):
+        if self.origin is None:
+            self.origin = self.origin_provider(self.hwnd)
+        return pos.x() - self.origin[0], pos.y() - self.origin[1]
+
+    def post(self, message, wparam, lparam):
+        try:
+            self.post_message(self.hwnd, message, wparam, lparam)
+            return True
+        except Exception as e:
+            logging.info(f"Embedded window {self.hwnd} no longer accepts input: {e}")
+            self.detach()
+            return False
+
+    def record_latency(self, started):
+        latency = time.perf_counter() - started
+        self.event_count += 1
+        self.total_latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+        if self.event_count % 1000 == 0:
+            logging.debug(f"Input forwarding for {self.hwnd}: {self.event_count} events, "
+                          f"avg {self.total_latency / self.event_count * 1e6:.0f} us, "
+                          f"max {self.max_latency * 1e6:.0f} us, {self.coalesced_count} moves coalesced")
+
+    # --- Mouse ---
+    def mouse_press(self, event, focus_hwnd):
+        if not self.alive:
+            return False
+        started = time.perf_counter()
+        self.flush_move()
+        messages = BUTTON_MESSAGES.get(event.button())
+        lparam = make_lparam(*self.to_child(event.pos()))
+        if (self.post(WM_MOUSEACTIVATE, (HTCLIENT << 16) | (focus_hwnd & 0xFFFF), lparam)
+                and self.post(WM_SETFOCUS, focus_hwnd, 0) and messages):
+            self.post(messages[0], mouse_key_state(event.buttons(), event.modifiers()), lparam)
+        self.record_latency(started)
+        return True
+
+    def mouse_release(self, event):
+        if not self.alive:
+            return False
+        started = time.perf_counter()
+        self.flush_move()
+        messages = BUTTON_MESSAGES.get(event.button())
+        if messages:
+            lparam = make_lparam(*self.to_child(event.pos()))
+            self.post(messages[1], mouse_key_state(event.buttons(), event.modifiers()), lparam)
+        self.record_latency(started)
+        return True
+
+    def mouse_move(self, event):
+        if not self.alive:
+            return False
+        if self.pending_move is not None:
+            self.coalesced_count += 1
+        self.pending_move = (time.perf_counter(), self.to_child(event.pos()),
+                             mouse_key_state(event.buttons(), event.modifiers()))
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.schedule(self.frame_ms, self.flush_move)
+        return True
+
+    def flush_move(self):
+        self.frame_scheduled = False
+        if self.pending_move is None or not self.alive:
+            self.pending_move = None
+            return
+        started, (x, y), key_state = self.pending_move
+        self.pending_move = None
+        self.post(WM_MOUSEMOVE, key_state, make_lparam(x, y))
+        self.record_latency(started)
+
+    def wheel(self, event):
+        if not self.alive:
+            return False
+        started = time.perf_counter()
+        self.flush_move()
+        key_state = mouse_key_state(event.buttons(), event.modifiers())
+        # Wheel messages carry screen coordinates
+        global_pos = event.globalPos()
+        lparam = make_lparam(global_pos.x(), global_pos.y())
+        delta = event.angleDelta()
+        if delta.y():
+            self.post(WM_MOUSEWHEEL, ((delta.y() & 0xFFFF) << 16) | key_state, lparam)
+        if delta.x():
+            self.post(WM_MOUSEHWHEEL, ((delta.x() & 0xFFFF) << 16) | key_state, lparam)
+        self.record_latency(started)
+        return True
+
+    # --- Keyboard ---
+    def virtual_key(self, event):
+        # On Windows Qt already knows the native virtual key, which avoids a VkKeyScan call
+        return event.nativeVirtualKey() or KEY_MAP.get(event.key(), 0)
+
+    def key_press(self, event):
+        if not self.alive:
+            return False
+        vk_code = self.virtual_key(event)
+        text = event.text()
+        if not vk_code and len(text) != 1:
+            return False
+        started = time.perf_counter()
+        alt_down = bool(event.modifiers() & Qt.AltModifier)
+        lparam = key_lparam(event.nativeScanCode(), False, event.isAutoRepeat(), alt_down)
+        message = WM_SYSKEYDOWN if alt_down and not event.modifiers() & Qt.ControlModifier else WM_KEYDOWN
+        if vk_code:
+            self.post(message, vk_code, lparam)
+        if len(text) == 1:
+            self.post(WM_CHAR, ord(text), lparam)
+        self.record_latency(started)
+        return True
+
+    def key_release(self, event):
+        if not self.alive:
+            return False
+        vk_code = self.virtual_key(event)
+        if not vk_code:
+            return False
+        started = time.perf_counter()
+        alt_down = bool(event.modifiers() & Qt.AltModifier) or event.key() == Qt.Key_Alt
+        message = WM_SYSKEYUP if alt_down and not event.modifiers() & Qt.ControlModifier else WM_KEYUP
+        self.post(message, vk_code, key_lparam(event.nativeScanCode(), True, False, alt_down))
+        self.record_latency(started)
+        return True
@@ -0,0 +1,126 @@
+import ctypes
+import logging
+from ctypes import wintypes
+
+# --- SetWindowPos / RedrawWindow flags ---
+SWP_NOZORDER = 0x0004
+SWP_NOREDRAW = 0x0008
+SWP_NOACTIVATE = 0x0010
+SWP_NOCOPYBITS = 0x0100
+SWP_NOOWNERZORDER = 0x0200
+RDW_INVALIDATE = 0x0001
+RDW_ERASE = 0x0004
+RDW_ALLCHILDREN = 0x0080
+RDW_FRAME = 0x0400
+
+DEFERRED_MOVE_FLAGS = SWP_NOZORDER | SWP_NOOWNERZORDER | SWP_NOACTIVATE | SWP_NOREDRAW | SWP_NOCOPYBITS
+REDRAW_FLAGS = RDW_INVALIDATE | RDW_ERASE | RDW_FRAME | RDW_ALLCHILDREN
+
+
+# --- Geometry backends ---
+# A backend applies a whole batch of (hwnd, x, y, width, height) moves at once
+# and repaints windows once their size has settled.
+class Win32GeometryBackend:
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+        self.user32.BeginDeferWindowPos.restype = wintypes.HANDLE
+        self.user32.BeginDeferWindowPos.argtypes = [ctypes.c_int]
+        self.user32.DeferWindowPos.restype = wintypes.HANDLE
+        self.user32.DeferWindowPos.argtypes = [wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int,
+                                               ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT]
+        self.user32.EndDeferWindowPos.argtypes = [wintypes.HANDLE]
+        self.user32.GetParent.restype = wintypes.HWND
+        self.user32.GetParent.argtypes = [wintypes.HWND]
+        self.user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int,
+                                             ctypes.c_int, ctypes.c_int, wintypes.UINT]
+        self.user32.RedrawWindow.argtypes = [wintypes.HWND, ctypes.c_void_p, wintypes.HRGN, wintypes.UINT]
+
+    def commit(self, geometries):
+        # DeferWindowPos only batches windows that share a parent. Every embedded window has
+        # its own container as parent, so each one costs a single SetWindowPos, all of them in
+        # the same frame; only siblings share a deferred transaction. Dead windows are dropped
+        # first, since one invalid handle makes a whole transaction fail.
+        by_parent = {}
+        for geometry in geometries:
+            if self.user32.IsWindow(geometry[0]):
+                by_parent.setdefault(self.user32.GetParent(geometry[0]), []).append(geometry)
+        for batch in by_parent.values():
+            if len(batch) == 1:
+                hwnd, x, y, width, height = batch[0]
+                self.user32.SetWindowPos(hwnd, None, x, y, width, height, DEFERRED_MOVE_FLAGS)
+            else:
+                self._commit_siblings(batch)
+
+    def _commit_siblings(self, geometries):
+        handle = self.user32.BeginDeferWindowPos(len(geometries))
+        for hwnd, x, y, width, height in geometries:
+            if handle:
+                handle = self.user32.DeferWindowPos(handle, hwnd, None, x, y, width, height, DEFERRED_MOVE_FLAGS)
+        if handle and self.user32.EndDeferWindowPos(handle):
+            return
+        logging.warning("Deferred window positioning failed. Moving windows one by one.")
+        for hwnd, x, y, width, height in geometries:
+            self.user32.SetWindowPos(hwnd, None, x, y, width, height, DEFERRED_MOVE_FLAGS)
+
+    def redraw(self, hwnds):
+        for hwnd in hwnds:
+            if self.user32.IsWindow(hwnd):
+                self.user32.RedrawWindow(hwnd, None, None, REDRAW_FLAGS)
+
+
+# --- Layout scheduler ---
+# Collects the latest geometry of every embedded window and commits all of them
+# at most once per frame. Moves are done without redrawing; windows are repainted
+# once no new geometry has arrived for settle_ms.
+class LayoutScheduler:
+    def __init__(self, backend, schedule, frame_ms=16, settle_ms=120):
+        self.backend = backend
+        self.schedule = schedule  # schedule(delay_ms, callback)
+        self.frame_ms = frame_ms
+        self.settle_ms = settle_ms
+        self.pending = {}
+        self.committed = {}
+        self.unpainted = set()
+        self.frame_scheduled = False
+        self.settle_generation = 0
+
+    def request(self, hwnd, width, height, x=0, y=0):
+        geometry = (x, y, width, height)
+        if hwnd not in self.pending and self.committed.get(hwnd) == geometry:
+            return
+        self.pending[hwnd] = geometry
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.schedule(self.frame_ms, self.flush)
+
+    def forget(self, hwnd):
+        self.pending.pop(hwnd, None)
+        self.committed.pop(hwnd, None)
+        self.unpainted.discard(hwnd)
+
+    def flush(self):
+        self.frame_scheduled = False
+        if not self.pending:
+            return
+        batch = [(hwnd,) + geometry for hwnd, geometry in self.pending.items()]
+        self.committed.update(self.pending)
+        self.unpainted.update(self.pending)
+        self.pending.clear()
+        try:
+            self.backend.commit(batch)
+        except Exception as e:
+            logging.error(f"Error committing window geometry: {e}")
+        self.settle_generation += 1
+        generation = self.settle_generation
+        self.schedule(self.settle_ms, lambda: self._settle(generation))
+
+    def _settle(self, generation):
+        # A newer frame was committed since this one; its own settle will repaint
+        if generation != self.settle_generation or self.pending:
+            return
+        hwnds = list(self.unpainted)
+        self.unpainted.clear()
+        try:
+            self.backend.redraw(hwnds)
+        except Exception as e:
+            logging.error(f"Error redrawing embedded windows: {e}")
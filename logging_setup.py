@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from collections import OrderedDict
+
+# --- Defaults ---
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+
+# --- Repeat filter ---
+# Lets the first `burst` copies of an identical message through per `interval` seconds and
+# drops the rest. The next copy after the interval reports how many were dropped.
+class RepeatFilter(logging.Filter):
+    def __init__(self, interval=5.0, burst=1, max_keys=1024):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.max_keys = max_keys
+        self.seen = OrderedDict()  # key -> [window start, passed in window, suppressed]
+
+    def filter(self, record):
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        state = self.seen.get(key)
+        if state is None or record.created - state[0] >= self.interval:
+            suppressed = state[2] if state else 0
+            self.seen[key] = [record.created, 1, 0]
+            self.seen.move_to_end(key)
+            if len(self.seen) > self.max_keys:
+                self.seen.popitem(last=False)
+            if suppressed:
+                record.msg = f"{message} (repeated {suppressed} more times)"
+                record.args = None
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return False
+
+
+# --- Structured output ---
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+# --- Setup ---
+# Every record goes through a queue; a background listener thread does the formatting and the
+# (rotating) file writes, so logging on the GUI thread never waits for the disk.
+def configure_logging(level=logging.INFO, log_path="window_grouper.log", json_path=None,
+                      max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT, repeat_interval=5.0):
+    file_handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [file_handler, stream_handler]
+    if json_path:
+        json_handler = logging.handlers.RotatingFileHandler(json_path, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding="utf-8")
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatFilter(interval=repeat_interval))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the interpreter exits
+    atexit.register(stop_listener, listener)
+    return listener
+
+
+def stop_listener(listener):
+    try:
+        listener.stop()
+    except AttributeError:
+        # Already stopped
+        pass
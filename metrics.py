@@ -0,0 +1,169 @@
+import bisect
+import functools
+import json
+import logging
+import os
+import time
+from collections import Counter
+
+# --- Constants ---
+# Histogram buckets double from 1 us up to about 17 s
+BUCKET_BOUNDS = [2 ** i * 1e-6 for i in range(25)]
+METRICS_PATH = "window_grouper_metrics.json"
+LOOP_LAG = "event_loop_lag"
+
+
+# --- Histogram ---
+class Histogram:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the percentile, never above the largest sample
+        target = fraction * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target and index < len(BUCKET_BOUNDS):
+                return min(BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets_us": {f"{BUCKET_BOUNDS[i] * 1e6:.0f}" if i < len(BUCKET_BOUNDS) else "inf": count
+                           for i, count in enumerate(self.counts) if count},
+        }
+
+
+# --- Metrics ---
+# Nothing here runs unless instrument() or count_calls() was called: they swap the timed or
+# counting wrappers in place of the original attributes, so with instrumentation off the hot
+# paths are exactly the uninstrumented code.
+class Metrics:
+    def __init__(self):
+        self.histograms = {}
+        self.calls = Counter()
+        self.originals = []
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    def timed(self, name, func):
+        record = self.record
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+
+    def counted(self, name, func):
+        calls = self.calls
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, cls, names):
+        # Patch before instances connect signals to these methods
+        for name in names:
+            original = cls.__dict__[name]
+            setattr(cls, name, self.timed(f"{cls.__name__}.{name}", original))
+            self.originals.append((cls, name, original))
+
+    def count_calls(self, owner, prefix, names=None):
+        for name in names or [name for name in dir(owner) if not name.startswith('_')]:
+            original = getattr(owner, name)
+            if not callable(original) or isinstance(original, type):
+                continue
+            setattr(owner, name, self.counted(f"{prefix}.{name}", original))
+            self.originals.append((owner, name, original))
+
+    def uninstrument(self):
+        for owner, name, original in reversed(self.originals):
+            setattr(owner, name, original)
+        self.originals = []
+
+    def snapshot(self):
+        return {
+            "time": time.time(),
+            "uptime_s": time.time() - self.started,
+            "timings": {name: histogram.as_dict() for name, histogram in sorted(self.histograms.items())},
+            "win32_calls": dict(self.calls.most_common()),
+            "win32_call_total": sum(self.calls.values()),
+        }
+
+    def summary(self):
+        parts = [f"Win32 calls: {sum(self.calls.values())}"]
+        lag = self.histograms.get(LOOP_LAG)
+        if lag and lag.count:
+            parts.append(f"loop lag p95 {lag.percentile(0.95) * 1000:.1f} ms")
+        timings = [(histogram.percentile(0.95), name) for name, histogram in self.histograms.items()
+                   if name != LOOP_LAG and histogram.count]
+        if timings:
+            p95, name = max(timings)
+            parts.append(f"slowest {name.split('.')[-1]} p95 {p95 * 1000:.1f} ms")
+        return " | ".join(parts)
+
+    def export(self, path=METRICS_PATH):
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as metrics_file:
+                json.dump(self.snapshot(), metrics_file, indent=1)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.error(f"Could not write metrics to {path}: {e}")
+
+
+# --- Event loop lag ---
+# A callback rescheduled every interval; how late it runs is how long the loop was busy.
+class LoopLagProbe:
+    def __init__(self, metrics, schedule, interval_ms=100):
+        self.metrics = metrics
+        self.schedule = schedule  # schedule(delay_ms, callback)
+        self.interval_ms = interval_ms
+        self.running = False
+        self.expected = None
+
+    def start(self):
+        self.running = True
+        self._arm()
+
+    def stop(self):
+        self.running = False
+
+    def _arm(self):
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self._tick)
+
+    def _tick(self):
+        if not self.running:
+            return
+        self.metrics.record(LOOP_LAG, max(0.0, time.perf_counter() - self.expected))
+        self._arm()
@@ -0,0 +1,186 @@
+import heapq
+import time
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QLineEdit, QListWidget, QListWidgetItem, QVBoxLayout
+
+# --- Scoring ---
+SUBSTRING_BONUS = 100
+CONSECUTIVE_BONUS = 5
+WORD_START_BONUS = 8
+RECENCY_WEIGHT = 10
+
+
+def word_starts(text):
+    return frozenset(i for i, char in enumerate(text) if char.isalnum() and (i == 0 or not text[i - 1].isalnum()))
+
+
+def fuzzy_score(query, text, starts):
+    # A contiguous match beats any scattered one; otherwise every query character must appear
+    # in order, rewarding runs and characters that start a word. None if there is no match.
+    position = text.find(query)
+    if position >= 0:
+        return SUBSTRING_BONUS + (WORD_START_BONUS if position in starts else 0) - position / len(text)
+    score = 0
+    last = -1
+    for char in query:
+        index = text.find(char, last + 1)
+        if index < 0:
+            return None
+        if index == last + 1:
+            score += CONSECUTIVE_BONUS
+        if index in starts:
+            score += WORD_START_BONUS
+        score += 1
+        last = index
+    return score
+
+
+# --- Search index ---
+# One entry per grouped window, kept up to date as windows are grouped, retitled, used and
+# ungrouped, so a search only scores precomputed lowercase text.
+class SwitchEntry:
+    __slots__ = ('hwnd', 'group', 'title', 'process', 'text', 'chars', 'starts', 'last_used')
+
+    def __init__(self, hwnd, group, title, process, last_used):
+        self.hwnd = hwnd
+        self.group = group
+        self.process = process
+        self.last_used = last_used
+        self.set_title(title)
+
+    def set_title(self, title):
+        self.title = title
+        self.text = f"{title} {self.process}".lower()
+        self.chars = frozenset(self.text)
+        self.starts = word_starts(self.text)
+
+
+class SwitchIndex:
+    def __init__(self):
+        self.entries = {}
+        self.clock = 0
+
+    def _tick(self):
+        self.clock += 1
+        return self.clock
+
+    def add(self, hwnd, group, title, process=""):
+        self.entries[hwnd] = SwitchEntry(hwnd, group, title, process or "", self._tick())
+
+    def remove(self, hwnd):
+        self.entries.pop(hwnd, None)
+
+    def update_title(self, hwnd, title):
+        entry = self.entries.get(hwnd)
+        if entry and entry.title != title:
+            entry.set_title(title)
+
+    def touch(self, hwnd):
+        entry = self.entries.get(hwnd)
+        if entry:
+            entry.last_used = self._tick()
+
+    def search(self, query, limit=20):
+        query = query.strip().lower()
+        clock = self.clock or 1
+        if not query:
+            return heapq.nlargest(limit, self.entries.values(), key=lambda entry: entry.last_used)
+        # Every space-separated term has to match, in any order
+        terms = query.split()
+        query_chars = frozenset("".join(terms))
+        scored = []
+        for entry in self.entries.values():
+            # Most entries are rejected by the character set alone
+            if not query_chars <= entry.chars:
+                continue
+            score = 0
+            for term in terms:
+                term_score = fuzzy_score(term, entry.text, entry.starts)
+                if term_score is None:
+                    break
+                score += term_score
+            else:
+                scored.append((score + RECENCY_WEIGHT * entry.last_used / clock, entry.last_used, entry))
+        return [entry for _, _, entry in heapq.nlargest(limit, scored, key=lambda item: item[:2])]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# --- Switcher popup ---
+# Type to filter, Up/Down to select, Enter to jump. on_chosen(hwnd) does the jump.
+class QuickSwitcher(QDialog):
+    def __init__(self, index, on_chosen, parent=None):
+        super().__init__(parent, Qt.Popup)
+        self.index = index
+        self.on_chosen = on_chosen
+        self.setMinimumWidth(520)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.query = QLineEdit()
+        self.query.setPlaceholderText("Jump to window...")
+        self.query.textChanged.connect(self.refresh)
+        self.query.returnPressed.connect(self.choose_current)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(lambda item: self.choose(item))
+        layout.addWidget(self.query)
+        layout.addWidget(self.results)
+
+    def popup(self):
+        self.query.clear()
+        self.refresh("")
+        parent = self.parentWidget()
+        if parent is not None:
+            self.move(parent.geometry().center().x() - self.width() // 2, parent.geometry().top() + 60)
+        self.show()
+        self.query.setFocus()
+
+    def refresh(self, query):
+        self.results.clear()
+        for entry in self.index.search(query):
+            source = f"{entry.process}, group {entry.group}" if entry.process else f"group {entry.group}"
+            item = QListWidgetItem(f"{entry.title}    [{source}]")
+            item.setData(Qt.UserRole, entry.hwnd)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Down, Qt.Key_Up) and self.results.count():
+            step = 1 if event.key() == Qt.Key_Down else -1
+            self.results.setCurrentRow((self.results.currentRow() + step) % self.results.count())
+            return
+        super().keyPressEvent(event)
+
+    def choose_current(self):
+        item = self.results.currentItem()
+        if item:
+            self.choose(item)
+
+    def choose(self, item):
+        self.hide()
+        self.on_chosen(item.data(Qt.UserRole))
+
+
+# --- Benchmark ---
+# python quick_switch.py
+if __name__ == '__main__':
+    import random
+
+    random.seed(1)
+    words = ["report", "budget", "inbox", "terminal", "build", "server", "notes", "draft", "review", "chart",
+             "invoice", "planning", "backup", "deploy", "monitor", "ticket", "design", "meeting", "log", "query"]
+    processes = ["chrome.exe", "code.exe", "winword.exe", "excel.exe", "putty.exe", "outlook.exe", "notepad.exe"]
+    index = SwitchIndex()
+    for hwnd in range(500):
+        title = " ".join(random.sample(words, 3)) + f" {hwnd}"
+        index.add(hwnd, "1", title.title(), random.choice(processes))
+    for query in ("", "rep", "bdgt", "putty srv", "excel invoice", "zzz"):
+        runs = 100
+        started = time.perf_counter()
+        for _ in range(runs):
+            results = index.search(query)
+        elapsed_ms = (time.perf_counter() - started) / runs * 1000
+        best = results[0].title if results else "-"
+        print(f"{query!r:>18}: {elapsed_ms:6.3f} ms, {len(results)} results, best: {best}")
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from window_backend import SW_RESTORE, SWP_FRAMECHANGED, SWP_NOZORDER, WS_CHILD
+
+# --- Constants ---
+SESSION_PATH = "window_grouper_session.jsonl"
+EMBEDDED = 'embedded'
+RELEASED = 'released'
+
+
+# --- Session state ---
+# groups: name -> {"mode", "layout", "windows": hwnd -> record}. A record is 'embedded' while the
+# window is parented to a container and 'released' once a clean shutdown restored it.
+class SessionState:
+    def __init__(self):
+        self.groups = OrderedDict()
+        self.clean_exit = True
+
+    def group(self, name):
+        if name not in self.groups:
+            self.groups[name] = {"mode": 'tabs', "layout": 'balanced', "windows": OrderedDict()}
+        return self.groups[name]
+
+    def apply(self, op):
+        kind = op.get("op")
+        if kind == 'start':
+            self.clean_exit = False
+        elif kind == 'clean_exit':
+            self.clean_exit = True
+        elif kind == 'group':
+            group = self.group(op["group"])
+            for key in ("mode", "layout"):
+                if op.get(key):
+                    group[key] = op[key]
+        elif kind == 'close_group':
+            self.groups.pop(op["group"], None)
+        elif kind == 'add':
+            # A saved window re-attached under a new handle replaces its old record
+            if op.get("replaces") is not None:
+                for group in self.groups.values():
+                    group["windows"].pop(op["replaces"], None)
+            record = {key: value for key, value in op.items() if key not in ("op", "replaces")}
+            record["state"] = EMBEDDED
+            self.group(op["group"])["windows"][op["hwnd"]] = record
+        elif kind == 'title':
+            for group in self.groups.values():
+                record = group["windows"].get(op["hwnd"])
+                if record is not None:
+                    record["title"] = op["title"]
+        elif kind in ('remove', 'release'):
+            for group in self.groups.values():
+                record = group["windows"].get(op["hwnd"])
+                if record is None:
+                    continue
+                if kind == 'remove':
+                    del group["windows"][op["hwnd"]]
+                else:
+                    record["state"] = RELEASED
+
+    def records(self, state=None):
+        return [record for group in self.groups.values() for record in group["windows"].values()
+                if state is None or record["state"] == state]
+
+    def snapshot_ops(self):
+        ops = []
+        for name, group in self.groups.items():
+            ops.append({"op": 'group', "group": name, "mode": group["mode"], "layout": group["layout"]})
+            for record in group["windows"].values():
+                ops.append(dict(record, op='add'))
+                if record["state"] == RELEASED:
+                    ops.append({"op": 'release', "hwnd": record["hwnd"]})
+        return ops
+
+
+# --- Journal ---
+# Append-only JSON lines, one operation per group/ungroup, flushed immediately so a crash
+# loses nothing. The file is compacted to a snapshot each time a session starts; saved windows
+# that are not re-attached stay in it for a later start.
+class SessionJournal:
+    def __init__(self, path=SESSION_PATH):
+        self.path = path
+        self.file = None
+        self.state = SessionState()
+
+    def load(self):
+        state = SessionState()
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    state.apply(json.loads(line))
+                except (ValueError, KeyError):
+                    # A crash can leave a partial last line
+                    logging.warning(f"Ignoring damaged session journal line: {line.strip()[:80]}")
+        return state
+
+    def start(self, state=None):
+        self.state = state or SessionState()
+        # Nothing is embedded yet: the last session released its windows or crash recovery did
+        for record in self.state.records(EMBEDDED):
+            record["state"] = RELEASED
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as journal_file:
+            for op in self.state.snapshot_ops():
+                journal_file.write(json.dumps(op) + "\n")
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.record('start', pid=os.getpid(), time=time.time())
+
+    def record(self, kind, **fields):
+        op = dict(fields, op=kind)
+        self.state.apply(op)
+        if self.file is None:
+            return
+        try:
+            self.file.write(json.dumps(op) + "\n")
+            self.file.flush()
+        except OSError as e:
+            logging.error(f"Could not write session journal: {e}")
+
+    def close(self):
+        if self.file is None:
+            return
+        self.record('clean_exit')
+        self.file.close()
+        self.file = None
+
+
+# --- Matching saved windows to live ones ---
+# One pass over the live windows builds the lookup tables. A saved window matches, in order of
+# preference: the same handle still owned by the same process and class, then the same
+# executable, class and title, then the same executable and class.
+def title_key(process, class_name, title):
+    return (process or "").lower(), class_name, title
+
+
+def match_saved_windows(records, candidates):
+    by_hwnd = {}
+    by_title = {}
+    by_class = {}
+    for candidate in candidates:
+        key = title_key(candidate.process, candidate.class_name, candidate.title)
+        by_hwnd[candidate.hwnd] = candidate
+        by_title.setdefault(key, []).append(candidate)
+        by_class.setdefault(key[:2], []).append(candidate)
+
+    used = set()
+    matches = {}
+    pending = []
+    for record in records:
+        candidate = by_hwnd.get(record["hwnd"])
+        if candidate and candidate.pid == record.get("pid") and candidate.class_name == record.get("class_name"):
+            used.add(candidate.hwnd)
+            matches[id(record)] = candidate
+        else:
+            pending.append(record)
+
+    for table, key_length in ((by_title, 3), (by_class, 2)):
+        still_pending = []
+        for record in pending:
+            key = title_key(record.get("process"), record.get("class_name"), record.get("title"))[:key_length]
+            candidate = next((c for c in table.get(key, ()) if c.hwnd not in used), None)
+            if candidate:
+                used.add(candidate.hwnd)
+                matches[id(record)] = candidate
+            else:
+                still_pending.append(record)
+        pending = still_pending
+
+    return [(record, matches[id(record)]) for record in records if id(record) in matches]
+
+
+# --- Crash recovery ---
+# A window journaled as embedded that is still a child but whose container is gone was left
+# behind by a crash; it gets its original style back and becomes top-level again.
+def is_orphaned(backend, hwnd, pid):
+    # A different owner means the handle was reused by another window
+    if not backend.is_window(hwnd) or backend.get_window_pid(hwnd) != pid:
+        return False
+    if not backend.get_style(hwnd) & WS_CHILD:
+        return False
+    parent = backend.get_parent(hwnd)
+    return not parent or not backend.is_window(parent)
+
+
+def recover_orphaned_windows(state, backend):
+    recovered = []
+    for record in state.records(EMBEDDED):
+        hwnd = record["hwnd"]
+        try:
+            if is_orphaned(backend, hwnd, record.get("pid")):
+                backend.set_style(hwnd, record["style"])
+                backend.set_parent(hwnd, None)
+                backend.show_window(hwnd, SW_RESTORE)
+                backend.set_window_pos(hwnd, None, 100, 100, 800, 600, SWP_NOZORDER | SWP_FRAMECHANGED)
+                recovered.append(hwnd)
+                logging.info(f"Recovered orphaned window '{record.get('title')}' ({hwnd})")
+        except Exception as e:
+            logging.error(f"Could not recover orphaned window {hwnd}: {e}")
+    return recovered
+
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Headless: Qt's offscreen platform and simulated windows, no desktop or pywin32
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import qInstallMessageHandler
+from PyQt5.QtWidgets import QApplication
+
+import codigo
+from win_events import ScriptedDragSource, ScriptedWindowSource
+from window_backend import SimulatedWindowBackend
+
+
+def wait_for(app, condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return condition()
+
+
+@pytest.fixture(scope="session")
+def app():
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+    # The offscreen platform warns about every native child window
+    qInstallMessageHandler(lambda *message: None)
+    return application
+
+
+@pytest.fixture
+def backend():
+    return SimulatedWindowBackend()
+
+
+@pytest.fixture
+def drag_source():
+    return ScriptedDragSource()
+
+
+@pytest.fixture
+def manager(app, backend, drag_source, monkeypatch):
+    monkeypatch.setattr(codigo, "RESTORE_TITLE_HOLD_SECONDS", 0)
+    manager = codigo.GroupManager(drag_source=drag_source, window_source=ScriptedWindowSource(), backend=backend)
+    yield manager
+    for group in list(manager.groups):
+        group.ready_to_close = True
+        group.close()
+        group.deleteLater()
+        manager.remove_group(group)
+    app.processEvents()
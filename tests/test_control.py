@@ -0,0 +1,93 @@
+import pytest
+
+from conftest import wait_for
+from control import ControlServer, execute_command
+
+
+# Stand-in for GroupManager: records the batches it is asked to group
+class StubTarget:
+    def __init__(self, windows):
+        self.windows = windows
+        self.batches = []
+
+    def list_windows(self):
+        return self.windows
+
+    def group_windows(self, group_name, hwnds, mode):
+        self.batches.append((group_name, hwnds, mode))
+        return hwnds
+
+    def ungroup_all(self, group_name):
+        return 0 if group_name == "empty" else 3
+
+    def describe_groups(self):
+        return [{"name": "1", "mode": 'tabs', "windows": []}]
+
+
+@pytest.fixture
+def target():
+    return StubTarget([
+        {"hwnd": 1, "title": "web-01 - PuTTY", "process": "putty.exe"},
+        {"hwnd": 2, "title": "web-02 - PuTTY", "process": "PUTTY.EXE"},
+        {"hwnd": 3, "title": "Monitor - Grafana", "process": "chrome.exe"},
+    ])
+
+
+def test_group_by_process_is_one_batch(target):
+    response = execute_command({"command": "group", "process": "putty", "group": "ops", "mode": "grid"}, target)
+
+    assert response == {"ok": True, "matched": 2, "grouped": [1, 2]}
+    assert target.batches == [("ops", [1, 2], "grid")]
+
+
+def test_group_by_title_pattern(target):
+    response = execute_command({"command": "group", "title": "^monitor"}, target)
+
+    assert response["grouped"] == [3]
+    assert target.batches == [(None, [3], None)]
+
+
+@pytest.mark.parametrize("request_, error", [
+    ({"command": "group"}, "'group' needs"),
+    ({"command": "group", "process": "putty", "mode": "stack"}, "Unknown mode"),
+    ({"command": "group", "title": "("}, "Invalid title pattern"),
+    ({"command": "explode"}, "Unknown command"),
+    (["group"], "must be a JSON object"),
+])
+def test_invalid_requests_are_rejected(target, request_, error):
+    response = execute_command(request_, target)
+
+    assert not response["ok"]
+    assert error in response["error"]
+    assert not target.batches
+
+
+def test_list_and_ungroup(target):
+    assert execute_command({"command": "list"}, target)["groups"][0]["name"] == "1"
+    assert execute_command({"command": "ungroup"}, target) == {"ok": True, "ungrouped": 3}
+    assert execute_command({"command": "ungroup", "group": "empty"}, target) == {"ok": True, "ungrouped": 0}
+
+
+def test_server_answers_one_line_per_request(target):
+    server = ControlServer(target)
+
+    assert server.handle_line(b'{"command": "list"}')["ok"]
+    assert server.handle_line(b"not json")["error"].startswith("Invalid JSON")
+
+
+def test_group_command_against_the_manager(app, manager, backend):
+    hwnds = [backend.create_window(f"web-0{index} - PuTTY", pid=6000 + index) for index in range(3)]
+    other = backend.create_window("Notes", pid=7000)
+    for hwnd in hwnds + [other]:
+        manager.window_index.window_created(hwnd)
+
+    response = execute_command({"command": "group", "title": "PuTTY$", "group": "ops", "mode": "grid"}, manager)
+    group = manager.find_group("ops")
+
+    assert response["matched"] == 3
+    assert wait_for(app, lambda: not group.active_embeds)
+    assert {entry.hwnd for entry in group.registry} == set(hwnds)
+    assert group.mode == 'grid'
+    assert other not in group.registry
+    # Grouped windows are no longer offered
+    assert execute_command({"command": "group", "title": "PuTTY$"}, manager)["matched"] == 0
@@ -0,0 +1,75 @@
+import os
+
+from conftest import wait_for
+
+
+def drop(app, drag_source, hwnd, cursor_pos):
+    drag_source.script = [('start', hwnd, cursor_pos), ('end', hwnd, cursor_pos)]
+    drag_source.replay()
+    app.processEvents()
+
+
+def test_window_dropped_on_a_group_is_grouped(app, manager, backend, drag_source):
+    group = manager.create_group()
+    group.show()
+    hwnd = backend.create_window("Notes", pid=4242)
+    center = group.geometry().center()
+
+    drop(app, drag_source, hwnd, (center.x(), center.y()))
+
+    assert wait_for(app, lambda: hwnd in group.registry)
+    assert backend.windows[hwnd].parent == int(group.registry.get(hwnd).container.winId())
+    assert manager.dragged_window_hwnd is None
+
+
+def test_drop_outside_every_group_is_ignored(app, manager, backend, drag_source):
+    group = manager.create_group()
+    group.show()
+    hwnd = backend.create_window("Notes", pid=4242)
+    outside = group.geometry().bottomRight()
+
+    drop(app, drag_source, hwnd, (outside.x() + 50, outside.y() + 50))
+
+    assert not group.active_embeds
+    assert hwnd not in group.registry
+
+
+def test_drop_goes_to_the_group_on_top(app, manager, backend, drag_source):
+    below = manager.create_group()
+    above = manager.create_group()
+    below.show()
+    above.show()
+    above.move(below.pos())
+    hwnd = backend.create_window("Notes", pid=4242)
+    center = below.geometry().center()
+
+    drop(app, drag_source, hwnd, (center.x(), center.y()))
+
+    assert wait_for(app, lambda: hwnd in above.registry)
+    assert hwnd not in below.registry
+
+
+def test_own_windows_are_never_grouped(app, manager, backend, drag_source):
+    group = manager.create_group()
+    group.show()
+    hwnd = backend.create_window("Settings", pid=os.getpid())
+    center = group.geometry().center()
+
+    drop(app, drag_source, hwnd, (center.x(), center.y()))
+
+    assert manager.dragged_window_hwnd is None
+    assert not group.active_embeds
+    assert hwnd not in group.registry
+
+
+def test_drop_is_embedded_outside_the_hook_callback(app, manager, backend, drag_source):
+    group = manager.create_group()
+    group.show()
+    hwnd = backend.create_window("Notes", pid=4242)
+    center = group.geometry().center()
+    drag_source.script = [('start', hwnd, (center.x(), center.y())), ('end', hwnd, (center.x(), center.y()))]
+
+    drag_source.replay()
+    assert hwnd not in group.pending_embeds
+
+    assert wait_for(app, lambda: hwnd in group.registry)
@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+
+import pytest
+
+from grouping_rules import GroupingRule, RuleEngine
+from window_index import IndexedWindow
+
+
+def window(title="Window", class_name="SimulatedWindow", process="app.exe", hwnd=1):
+    return IndexedWindow(hwnd, title, class_name, 1000, process, f"C:\\{process}", True)
+
+
+@pytest.fixture
+def checked(monkeypatch):
+    # Counts matches() calls per rule group, to see which buckets a match looked at
+    counts = Counter()
+    matches = GroupingRule.matches
+
+    def counting_matches(rule, candidate):
+        counts[rule.group] += 1
+        return matches(rule, candidate)
+
+    monkeypatch.setattr(GroupingRule, "matches", counting_matches)
+    return counts
+
+
+def test_process_names_are_normalised_to_exe():
+    engine = RuleEngine([GroupingRule("ssh", process="PuTTY")])
+
+    assert engine.match(window(process="putty.exe")).group == "ssh"
+    assert engine.match(window(process="PUTTY.EXE")).group == "ssh"
+    assert engine.match(window(process="putty64.exe")) is None
+    assert GroupingRule("ssh", process="putty.exe").process == "putty.exe"
+
+
+def test_rule_without_conditions_is_rejected():
+    with pytest.raises(ValueError):
+        GroupingRule("empty")
+
+
+def test_every_condition_of_a_rule_must_match():
+    engine = RuleEngine([GroupingRule("prod", process="putty", class_name="PuTTY", title="^prod")])
+
+    assert engine.match(window("PROD-db1", "PuTTY", "putty.exe")).group == "prod"
+    assert engine.match(window("test-db1", "PuTTY", "putty.exe")) is None
+    assert engine.match(window("prod-db1", "Other", "putty.exe")) is None
+
+
+def test_match_only_checks_the_buckets_of_the_window(checked):
+    engine = RuleEngine([GroupingRule("editor", process="code", title="^notes"), GroupingRule("shell", process="cmd"),
+                         GroupingRule("explorer", class_name="CabinetWClass"),
+                         GroupingRule("browser", class_name="Chrome_WidgetWin_1", title="^notes"),
+                         GroupingRule("docs", title="manual")])
+
+    assert engine.match(window("main.py", "Chrome_WidgetWin_1", "code.exe")) is None
+    assert checked == {"editor": 1, "browser": 1, "docs": 1}
+
+
+def test_first_defined_rule_wins_across_buckets():
+    title_first = RuleEngine([GroupingRule("by title", title="report"), GroupingRule("by class", class_name="XLMAIN"),
+                              GroupingRule("by process", process="excel")])
+    process_first = RuleEngine([GroupingRule("by process", process="excel"), GroupingRule("by title", title="report"),
+                                GroupingRule("by process again", process="excel")])
+    excel = window("Q3 report.xlsx", "XLMAIN", "EXCEL.EXE")
+
+    assert title_first.match(excel).group == "by title"
+    assert process_first.match(excel).group == "by process"
+    assert process_first.match(window("budget.xlsx", "XLMAIN", "excel.exe")).group == "by process"
+
+
+def test_matching_hundreds_of_windows_against_hundreds_of_rules(checked):
+    rules = [GroupingRule(f"process {index}", process=f"app{index}") for index in range(200)]
+    rules += [GroupingRule(f"class {index}", class_name=f"Class{index}") for index in range(200)]
+    rules += [GroupingRule(f"title {index}", title=f"^Document {index}$") for index in range(20)]
+    engine = RuleEngine(rules)
+    windows = [window(f"Window {index}", "Other", f"app{index}.exe", hwnd=index) for index in range(200)]
+    windows += [window(f"Window {index}", f"Class{index}", "other.exe", hwnd=200 + index) for index in range(200)]
+
+    start = time.perf_counter()
+    for _ in range(10):
+        groups = [engine.match(candidate).group for candidate in windows]
+    elapsed = time.perf_counter() - start
+
+    assert groups[:200] == [f"process {index}" for index in range(200)]
+    assert groups[200:] == [f"class {index}" for index in range(200)]
+    # One check per match: the bucket rule, with every title rule defined later and so skipped
+    assert sum(checked.values()) == 10 * len(windows)
+    assert elapsed < 0.5
@@ -0,0 +1,96 @@
+from conftest import wait_for
+from layout_scheduler import LayoutScheduler
+from window_backend import SimulatedGeometryBackend
+
+
+class ManualClock:
+    # Collects scheduled callbacks; run() fires them like the event loop would
+    def __init__(self):
+        self.callbacks = []
+
+    def schedule(self, delay_ms, callback):
+        self.callbacks.append(callback)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def test_many_windows_cost_one_commit_per_frame(backend):
+    geometry = SimulatedGeometryBackend(backend)
+    clock = ManualClock()
+    scheduler = LayoutScheduler(geometry, clock.schedule)
+    hwnds = [backend.create_window(f"Window {index}") for index in range(50)]
+
+    for step in range(5):
+        for hwnd in hwnds:
+            scheduler.request(hwnd, 400 + step, 300)
+    assert len(clock.callbacks) == 1
+
+    clock.run()
+    assert geometry.commit_count == 1
+    assert geometry.move_count == 50
+    assert all(backend.windows[hwnd].rect == (0, 0, 404, 300) for hwnd in hwnds)
+
+
+def test_unchanged_geometry_is_not_committed_again(backend):
+    geometry = SimulatedGeometryBackend(backend)
+    clock = ManualClock()
+    scheduler = LayoutScheduler(geometry, clock.schedule)
+    hwnd = backend.create_window("Window")
+    scheduler.request(hwnd, 400, 300)
+    clock.run()
+
+    scheduler.request(hwnd, 400, 300)
+    assert geometry.commit_count == 1
+
+
+def test_windows_are_repainted_once_after_they_settle(backend):
+    geometry = SimulatedGeometryBackend(backend)
+    clock = ManualClock()
+    scheduler = LayoutScheduler(geometry, clock.schedule)
+    hwnds = [backend.create_window(f"Window {index}") for index in range(3)]
+    for width in (400, 410):
+        for hwnd in hwnds:
+            scheduler.request(hwnd, width, 300)
+        clock.run()  # commits the frame and schedules its settle
+
+    clock.run()  # the first settle is stale, the second repaints
+    assert geometry.commit_count == 2
+    assert geometry.redraw_count == 3
+
+
+def test_positioning_calls_match_win32_parenting(backend):
+    geometry = SimulatedGeometryBackend(backend)
+    alone = [backend.create_window(f"Alone {index}") for index in range(4)]
+    for index, hwnd in enumerate(alone):
+        backend.set_parent(hwnd, 0x9000 + index)
+    siblings = [backend.create_window(f"Sibling {index}") for index in range(4)]
+    for hwnd in siblings:
+        backend.set_parent(hwnd, 0x8000)
+    backend.call_counts.clear()
+
+    geometry.commit([(hwnd, 0, 0, 100, 100) for hwnd in alone + siblings])
+
+    # One SetWindowPos per window alone under its parent, one deferred transaction for the siblings
+    assert backend.call_counts['set_window_pos'] == 4
+    assert backend.call_counts['defer_window_pos'] == 1
+
+
+def test_group_resize_commits_every_pane_at_once(app, manager, backend):
+    group = manager.create_group()
+    group.show()
+    hwnds = [backend.create_window(f"Window {index}", pid=3000 + index) for index in range(20)]
+    group.group_windows(hwnds, 'grid')
+    assert wait_for(app, lambda: not group.active_embeds)
+    group.layout_scheduler.flush()
+    geometry = group.layout_scheduler.backend
+    commits, moves = geometry.commit_count, geometry.move_count
+
+    group.resize(group.width() + 200, group.height() + 100)
+    app.processEvents()
+    group.layout_scheduler.flush()
+
+    assert geometry.commit_count == commits + 1
+    assert geometry.move_count == moves + 20
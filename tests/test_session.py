@@ -0,0 +1,183 @@
+import json
+
+import pytest
+
+from conftest import wait_for
+from session import (EMBEDDED, RELEASED, SessionJournal, SessionState, match_saved_windows,
+                     recover_orphaned_windows)
+from window_backend import WS_CAPTION, WS_CHILD, WS_OVERLAPPEDWINDOW, WS_VISIBLE
+from window_index import IndexedWindow
+
+ORIGINAL_STYLE = WS_VISIBLE | WS_OVERLAPPEDWINDOW
+
+
+def add_op(hwnd, group="1", title="Document", pid=500, **fields):
+    return dict({"op": 'add', "group": group, "hwnd": hwnd, "pid": pid, "process": "notepad.exe",
+                 "class_name": "Notepad", "title": title, "style": ORIGINAL_STYLE}, **fields)
+
+
+def candidate(hwnd, title="Document", pid=500, class_name="Notepad", process="notepad.exe"):
+    return IndexedWindow(hwnd, title, class_name, pid, process, "", True)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return SessionJournal(str(tmp_path / "session.jsonl"))
+
+
+# --- SessionState ---
+def test_add_records_an_embedded_window_and_replaces_its_old_handle():
+    state = SessionState()
+    state.apply(add_op(1, group="1"))
+    state.apply(add_op(2, group="2", replaces=1))
+
+    assert 1 not in state.groups["1"]["windows"]
+    record = state.groups["2"]["windows"][2]
+    assert record["state"] == EMBEDDED and "replaces" not in record and "op" not in record
+
+
+def test_remove_release_and_close_group():
+    state = SessionState()
+    for hwnd in (1, 2):
+        state.apply(add_op(hwnd, group="1"))
+    state.apply(add_op(3, group="2"))
+    state.apply({"op": 'group', "group": "1", "mode": 'grid', "layout": 'bsp'})
+
+    state.apply({"op": 'remove', "hwnd": 1})
+    state.apply({"op": 'release', "hwnd": 2})
+    state.apply({"op": 'title', "hwnd": 2, "title": "Renamed"})
+    state.apply({"op": 'close_group', "group": "2"})
+
+    assert list(state.groups) == ["1"]
+    assert (state.groups["1"]["mode"], state.groups["1"]["layout"]) == ('grid', 'bsp')
+    assert [(record["hwnd"], record["state"], record["title"]) for record in state.records()] == \
+        [(2, RELEASED, "Renamed")]
+    assert state.records(EMBEDDED) == []
+
+
+def test_snapshot_replays_to_the_same_state():
+    state = SessionState()
+    state.apply(add_op(1))
+    state.apply(add_op(2, group="2"))
+    state.apply({"op": 'release', "hwnd": 2})
+    replayed = SessionState()
+    for op in state.snapshot_ops():
+        replayed.apply(op)
+
+    assert replayed.groups == state.groups
+
+
+def test_journal_survives_a_damaged_last_line(journal):
+    journal.start()
+    journal.record('add', **{key: value for key, value in add_op(1).items() if key != "op"})
+    journal.file.write('{"op": "add", "group": "1", "hw')  # crash in the middle of a write
+    journal.file.close()
+
+    state = journal.load()
+
+    assert not state.clean_exit
+    assert [record["hwnd"] for record in state.records(EMBEDDED)] == [1]
+
+
+def test_clean_exit_and_restart_release_every_window(journal):
+    journal.start()
+    journal.record('add', **{key: value for key, value in add_op(1).items() if key != "op"})
+    journal.close()
+    state = journal.load()
+    assert state.clean_exit
+
+    journal.start(state)
+    journal.close()
+    with open(journal.path, encoding="utf-8") as journal_file:
+        ops = [json.loads(line)["op"] for line in journal_file]
+
+    assert journal.load().records()[0]["state"] == RELEASED
+    assert ops == ['group', 'add', 'release', 'start', 'clean_exit']
+
+
+# --- match_saved_windows ---
+def test_matching_prefers_the_same_handle_then_title_then_class():
+    records = [add_op(1, title="a.txt"), add_op(2, title="b.txt"), add_op(3, title="c.txt"), add_op(4, title="d.txt")]
+    candidates = [
+        candidate(30, title="c.txt"),  # exe and class only
+        candidate(20, title="b.txt"),  # exe, class and title
+        candidate(1, title="renamed"),  # same handle, process and class
+        candidate(2, title="b.txt", pid=999),  # handle reused by another process
+    ]
+
+    matches = {record["hwnd"]: window.hwnd for record, window in match_saved_windows(records, candidates)}
+
+    assert matches == {1: 1, 2: 20, 3: 30, 4: 2}
+
+
+def test_each_live_window_matches_one_record():
+    records = [add_op(1, title="a.txt"), add_op(2, title="a.txt")]
+    candidates = [candidate(10, title="a.txt"), candidate(11, title="other", class_name="Other")]
+
+    assert [(record["hwnd"], window.hwnd) for record, window in match_saved_windows(records, candidates)] == [(1, 10)]
+
+
+def test_process_names_match_case_insensitively():
+    records = [add_op(1, process="NOTEPAD.EXE")]
+
+    assert len(match_saved_windows(records, [candidate(10, process="notepad.exe")])) == 1
+
+
+# --- Crash recovery ---
+def embed_after_crash(backend, title="Document", pid=500, parent=0x7FFF0000):
+    hwnd = backend.create_window(title, "Notepad", pid, ORIGINAL_STYLE)
+    backend.set_style(hwnd, (ORIGINAL_STYLE & ~WS_CAPTION) | WS_CHILD)
+    backend.set_parent(hwnd, parent)
+    return hwnd
+
+
+def test_recover_orphaned_windows(backend):
+    orphan = embed_after_crash(backend)
+    released = embed_after_crash(backend)
+    reused = embed_after_crash(backend, pid=999)
+    living_parent = backend.create_window("Other application")
+    inside_other = embed_after_crash(backend, parent=living_parent)
+    state = SessionState()
+    for hwnd in (orphan, released, reused, inside_other):
+        state.apply(add_op(hwnd))
+    state.apply({"op": 'release', "hwnd": released})
+
+    assert recover_orphaned_windows(state, backend) == [orphan]
+    assert backend.windows[orphan].style == ORIGINAL_STYLE and backend.windows[orphan].parent == 0
+    for hwnd in (released, reused, inside_other):
+        assert backend.windows[hwnd].style & WS_CHILD
+
+
+def test_recovery_skips_windows_that_are_gone(backend):
+    state = SessionState()
+    state.apply(add_op(0x999))
+
+    assert recover_orphaned_windows(state, backend) == []
+
+
+# --- GroupManager.restore_session ---
+def test_restore_session_reattaches_a_saved_workspace(app, manager, backend, journal):
+    kept = backend.create_window("notes.txt", "Notepad", 500)
+    restarted = backend.create_window("todo.txt", "Notepad", 501)
+    for hwnd in (kept, restarted):
+        manager.window_index.window_created(hwnd)
+    process = manager.window_index.get(kept).process
+    state = SessionState()
+    state.apply({"op": 'group', "group": "work", "mode": 'grid', "layout": 'bsp'})
+    state.apply(add_op(kept, group="work", title="notes.txt", process=process))
+    # Saved under the handle it had before its application was restarted
+    state.apply(add_op(0x999, group="work", title="todo.txt", pid=400, process=process))
+    state.apply(add_op(0x998, group="work", title="gone.txt", process="gone.exe"))
+    journal.start(state)
+    manager.session = journal
+
+    assert manager.restore_session(state) == 2
+    group = manager.find_group("work")
+    assert wait_for(app, lambda: len(group.registry) == 2)
+
+    assert group.mode == 'grid' and group.host.tiling.kind == 'bsp'
+    assert backend.windows[restarted].parent == int(group.registry.get(restarted).container.winId())
+    # The re-attached window took over its saved record; the unmatched one stays for a later start
+    saved = journal.load().groups["work"]["windows"]
+    assert sorted(saved) == sorted([kept, restarted, 0x998])
+    assert saved[restarted]["state"] == EMBEDDED and saved[0x998]["state"] == RELEASED
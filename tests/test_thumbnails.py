@@ -0,0 +1,187 @@
+import threading
+
+import pytest
+
+from conftest import wait_for
+from thumbnails import OverviewPanel, ThumbnailCache, ThumbnailCapturer
+
+
+class FakeCapture:
+    # Images are strings; every capture of a window returns a new one
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+        self.threads = set()
+
+    def __call__(self, hwnd, width, height):
+        self.calls.append(hwnd)
+        self.threads.add(threading.current_thread())
+        if hwnd in self.failing:
+            raise OSError("window is gone")
+        return f"image {hwnd} #{self.calls.count(hwnd)}"
+
+
+@pytest.fixture
+def capture():
+    return FakeCapture()
+
+
+def cache_for(capture, images):
+    # Room for `images` snapshots of 10 bytes each
+    return ThumbnailCache(capture, max_bytes=10 * images, size_of=lambda image: 10)
+
+
+def test_cache_stays_within_its_byte_budget(capture):
+    cache = cache_for(capture, 3)
+    for hwnd in range(5):
+        cache.get(hwnd)
+
+    assert len(cache) == 3 and cache.total_bytes == 30
+    assert cache.evictions == 2
+
+    cache.set_max_bytes(10)
+    assert list(cache.entries) == [4] and cache.total_bytes == 10
+
+
+def test_image_larger_than_the_budget_is_not_kept(capture):
+    cache = ThumbnailCache(capture, max_bytes=5, size_of=lambda image: 10)
+
+    assert cache.get(1) == "image 1 #1"
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+
+def test_least_recently_used_window_is_evicted_first(capture):
+    cache = cache_for(capture, 3)
+    for hwnd in (1, 2, 3):
+        cache.get(hwnd)
+    cache.get(1)  # a hit
+    cache.peek(2)  # looking counts as use too
+    cache.get(4)
+
+    assert list(cache.entries) == [1, 2, 4]
+
+
+def test_clean_windows_are_not_captured_again(capture):
+    cache = cache_for(capture, 3)
+    cache.get(1)
+    cache.get(1)
+
+    assert capture.calls == [1] and (cache.hits, cache.captures) == (1, 1)
+
+
+def test_dirty_windows_are_recaptured_and_peek_never_captures(capture):
+    cache = cache_for(capture, 3)
+    assert cache.peek(1) is None and cache.needs_capture(1)
+    cache.get(1)
+    cache.mark_dirty(1)
+    cache.mark_dirty(2)  # unknown windows are ignored
+
+    assert cache.needs_capture(1)
+    assert cache.peek(1) == "image 1 #1"
+    assert capture.calls == [1]
+    assert cache.get(1) == "image 1 #2"
+    assert not cache.needs_capture(1)
+
+
+def test_failed_capture_keeps_the_stale_image(capture):
+    cache = cache_for(capture, 3)
+    cache.get(1)
+    cache.mark_dirty(1)
+    capture.failing.add(1)
+
+    assert cache.get(1) == "image 1 #1"
+    assert cache.needs_capture(1)  # tried again next time
+    capture.failing.add(2)
+    assert cache.get(2) is None and 2 not in cache.entries
+
+
+def test_forget_releases_the_bytes(capture):
+    cache = cache_for(capture, 3)
+    cache.get(1)
+    cache.get(2)
+    cache.forget(1)
+    cache.forget(3)
+
+    assert list(cache.entries) == [2] and cache.total_bytes == 10
+
+
+# --- ThumbnailCapturer ---
+def run_on_thread(function, *args):
+    threading.Thread(target=function, args=args, daemon=True).start()
+
+
+def test_capturer_captures_off_the_gui_thread(app, capture):
+    cache = cache_for(capture, 3)
+    capturer = ThumbnailCapturer(cache, run_on_thread)
+    ready = []
+    capturer.ready.connect(ready.append)
+
+    assert capturer.request(1)
+    assert not capturer.request(1)  # already being captured
+    assert wait_for(app, lambda: ready == [1])
+
+    assert threading.main_thread() not in capture.threads
+    assert cache.peek(1) == "image 1 #1" and not capturer.in_flight
+    assert not capturer.request(1)  # clean, nothing to do
+
+
+def test_capturer_drops_captures_of_forgotten_windows(app, capture):
+    cache = cache_for(capture, 3)
+    started = []
+    capturer = ThumbnailCapturer(cache, lambda function, *args: started.append((function, args)))
+    capturer.request(1)
+    capturer.forget(1)
+    function, args = started[0]
+    function(*args)
+    app.processEvents()
+
+    assert cache.peek(1) is None
+
+
+def test_capturer_keeps_the_stale_image_when_a_capture_fails(app, capture):
+    cache = cache_for(capture, 3)
+    capturer = ThumbnailCapturer(cache, run_on_thread)
+    cache.get(1)
+    cache.mark_dirty(1)
+    capture.failing.add(1)
+    ready = []
+    capturer.ready.connect(ready.append)
+    capturer.request(1)
+
+    assert wait_for(app, lambda: not capturer.in_flight)
+    app.processEvents()
+    assert ready == [] and cache.peek(1) == "image 1 #1"
+
+
+def test_overview_shows_cached_tiles_and_fills_in_the_rest(app, backend):
+    cache = ThumbnailCache(backend.capture_window)
+    capturer = ThumbnailCapturer(cache, run_on_thread)
+    hwnds = [backend.create_window(f"Window {index}") for index in range(5)]
+    cache.get(hwnds[0])
+    panel = OverviewPanel(capturer, lambda hwnd: None, lambda: None)
+    panel.open([(hwnd, f"Window {index}") for index, hwnd in enumerate(hwnds)])
+
+    assert list(panel.pending) == hwnds[1:]
+    assert wait_for(app, lambda: len(cache) == 5 and not panel.pending and not capturer.in_flight)
+    assert backend.call_counts['capture_window'] == 5
+    panel.deleteLater()
+
+
+def test_opening_the_overview_only_recaptures_the_current_tab(app, manager, backend):
+    group = manager.create_group()
+    hwnds = [backend.create_window(f"Window {index}") for index in range(4)]
+    group.group_windows(hwnds, 'grid')
+    assert wait_for(app, lambda: len(group.registry) == 4)
+    for hwnd in hwnds:
+        manager.thumbnails.get(hwnd)
+
+    group.toggle_overview()
+    assert not group.overview.pending
+    group.toggle_overview()
+
+    group.switch_to_tab_mode()
+    for hwnd in hwnds:
+        manager.thumbnails.get(hwnd)
+    group.toggle_overview()
+    assert list(group.overview.pending) == [group.host.current.hwnd]
+    group.toggle_overview()
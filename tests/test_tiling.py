@@ -0,0 +1,85 @@
+import pytest
+
+from tiling import LAYOUTS, TilingLayout, split_length
+
+
+def covers_exactly(rects, width, height):
+    area = sum(w * h for _, _, w, h in rects)
+    inside = all(x >= 0 and y >= 0 and x + w <= width and y + h <= height for x, y, w, h in rects)
+    overlapping = any(ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+                      for i, (ax, ay, aw, ah) in enumerate(rects) for bx, by, bw, bh in rects[i + 1:])
+    return area == width * height and inside and not overlapping
+
+
+def test_split_length_adds_up():
+    assert split_length(10, 3) == [3, 3, 4]
+    assert sum(split_length(1199, 7)) == 1199
+
+
+@pytest.mark.parametrize("kind", sorted(LAYOUTS))
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13, 50])
+def test_layouts_tile_the_area(kind, count):
+    rects = LAYOUTS[kind](count, 1200, 800)
+
+    assert len(rects) == count
+    assert covers_exactly(rects, 1200, 800)
+
+
+def test_empty_layouts():
+    for layout in LAYOUTS.values():
+        assert layout(0, 1200, 800) == []
+
+
+def test_bsp_panes_stay_within_a_factor_of_two():
+    areas = [w * h for _, _, w, h in LAYOUTS['bsp'](23, 1600, 1000)]
+    # Integer halving can leave a pane one pixel short of an exact half
+    assert max(areas) <= 2.01 * min(areas)
+
+
+def test_removing_a_pane_keeps_the_others_in_place():
+    tiling = TilingLayout('bsp')
+    for key in "abcdef":
+        tiling.add(key)
+    tiling.relayout(1200, 800)
+    positions = dict(tiling.positions)
+
+    tiling.remove("b")
+
+    # Only the last pane moves, into the freed slot
+    assert tiling.keys == list("afcde")
+    assert all(tiling.positions[key] == positions[key] for key in "acde")
+
+
+def test_relayout_only_reports_changed_panes():
+    tiling = TilingLayout('master_stack', gap=4)
+    for key in range(4):
+        tiling.add(key)
+
+    assert len(tiling.relayout(1200, 800)) == 4
+    assert tiling.relayout(1200, 800) == {}
+    # A fifth stacked pane moves the other stacked panes, not the master
+    tiling.add(4)
+    changed = tiling.relayout(1200, 800)
+    assert 0 not in changed and set(changed) == {1, 2, 3, 4}
+    tiling.invalidate()
+    assert len(tiling.relayout(1200, 800)) == 5
+
+
+def test_gap_between_panes():
+    tiling = TilingLayout('balanced', gap=4)
+    tiling.add("left")
+    tiling.add("right")
+    rects = tiling.relayout(1000, 500)
+
+    left_x, _, left_width, left_height = rects["left"]
+    right_x, _, right_width, _ = rects["right"]
+    assert right_x - (left_x + left_width) == 4
+    assert left_width + right_width + 4 == 1000
+    assert left_height == 500
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(ValueError):
+        TilingLayout('spiral')
+    with pytest.raises(ValueError):
+        TilingLayout().set_kind('spiral')
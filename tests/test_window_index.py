@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from window_backend import SW_SHOW, WS_CHILD, SimulatedWindowBackend
+from window_index import WindowIndex
+
+
+class ProcessTable:
+    def __init__(self):
+        self.lookups = []
+
+    def __call__(self, pid):
+        self.lookups.append(pid)
+        return f"app{pid}.exe", f"C:\\Apps\\app{pid}.exe"
+
+
+@pytest.fixture
+def processes():
+    return ProcessTable()
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def index(backend, processes, events):
+    index = WindowIndex(backend.describe_window, processes)
+    index.subscribe(lambda kind, window: events.append((kind, window.hwnd)))
+    return index
+
+
+def test_created_windows_are_added_once(backend, index, processes, events):
+    hwnd = backend.create_window("Editor", "EditorClass", pid=7)
+    index.window_created(hwnd)
+    index.window_created(hwnd)
+
+    window = index.get(hwnd)
+    assert (window.title, window.class_name, window.pid) == ("Editor", "EditorClass", 7)
+    assert (window.process, window.exe) == ("app7.exe", "C:\\Apps\\app7.exe")
+    assert events == [('added', hwnd)]
+    assert processes.lookups == [7]
+
+
+def test_child_windows_are_not_indexed(backend, index, events):
+    hwnd = backend.create_window("Button", style=WS_CHILD)
+    index.window_created(hwnd)
+
+    assert hwnd not in index and events == []
+
+
+def test_show_hide_and_rename_update_the_window(backend, index, events):
+    hwnd = backend.create_window("Untitled", pid=7)
+    index.window_created(hwnd)
+
+    index.window_hidden(hwnd)
+    assert not index.get(hwnd).visible and index.visible_windows() == []
+    backend.show_window(hwnd, SW_SHOW)
+    index.window_shown(hwnd)
+    assert index.get(hwnd).visible
+    backend.set_text(hwnd, "notes.txt")
+    index.window_renamed(hwnd)
+    assert index.get(hwnd).title == "notes.txt"
+    assert events == [('added', hwnd), ('updated', hwnd), ('updated', hwnd), ('updated', hwnd)]
+
+
+def test_unknown_windows_are_added_when_shown_but_not_when_renamed(backend, index):
+    shown = backend.create_window("Shown")
+    renamed = backend.create_window("Renamed")
+    index.window_shown(shown)
+    index.window_renamed(renamed)
+
+    assert shown in index and renamed not in index
+
+
+def test_reparented_window_is_removed(backend, index, events):
+    hwnd = backend.create_window("Embedded", pid=7)
+    index.window_created(hwnd)
+    # What a group does when it embeds the window
+    backend.set_style(hwnd, backend.get_style(hwnd) | WS_CHILD)
+    backend.set_parent(hwnd, 0x500)
+    index.window_renamed(hwnd)
+
+    assert hwnd not in index
+    assert events == [('added', hwnd), ('removed', hwnd)]
+    assert 7 not in index.processes
+
+
+def test_process_information_is_shared_by_the_windows_of_a_process(backend, index, processes):
+    first = backend.create_window("One", pid=7)
+    second = backend.create_window("Two", pid=7)
+    other = backend.create_window("Other", pid=8)
+    for hwnd in (first, second, other):
+        index.window_created(hwnd)
+    assert processes.lookups == [7, 8]
+    assert index.processes[7][2] == 2
+
+    index.window_destroyed(first)
+    assert index.processes[7][2] == 1
+    index.window_destroyed(second)
+    assert 7 not in index.processes and 8 in index.processes
+
+    # A new process reusing the pid is looked up again
+    index.window_created(backend.create_window("Three", pid=7))
+    assert processes.lookups == [7, 8, 7]
+
+
+def test_destroying_an_unknown_window_is_ignored(index, events):
+    index.window_destroyed(0x999)
+
+    assert events == []
+
+
+def test_rebuild_replaces_the_index(backend, index, processes):
+    old = backend.create_window("Old", pid=7)
+    index.window_created(old)
+    new = [backend.create_window(f"New {number}", pid=8) for number in range(3)]
+    index.rebuild(new)
+
+    assert old not in index and len(index) == 3
+    assert list(index.processes) == [8]
+
+
+def test_events_cost_no_enumeration_with_hundreds_of_windows(processes):
+    backend = SimulatedWindowBackend()
+    index = WindowIndex(backend.describe_window, processes)
+    hwnds = [backend.create_window(f"Window {number}", pid=1000 + number % 50) for number in range(500)]
+    index.rebuild(hwnds)
+
+    start = time.perf_counter()
+    for hwnd in hwnds:
+        backend.set_text(hwnd, "renamed")
+        index.window_renamed(hwnd)
+    for hwnd in hwnds[:250]:
+        index.window_destroyed(hwnd)
+    elapsed = time.perf_counter() - start
+
+    assert backend.call_counts['enum_windows'] == 0
+    assert len(processes.lookups) == 50
+    assert len(index) == 250 and len(index.processes) == 50
+    assert elapsed < 0.5
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+import codigo
+from conftest import wait_for
+from window_registry import WindowRegistry
+
+
+def test_registry_keeps_grouping_order():
+    registry = WindowRegistry()
+    for hwnd in (30, 10, 20):
+        registry.add(hwnd, f"container {hwnd}", 0, f"Window {hwnd}", 1000 + hwnd)
+    registry.remove(10)
+
+    assert [entry.hwnd for entry in registry] == [30, 20]
+    assert len(registry) == 2
+    assert 10 not in registry and 20 in registry
+    assert registry.get(20).container == "container 20"
+    assert registry.get(10) is None
+
+
+def test_registry_rejects_a_window_grouped_twice():
+    registry = WindowRegistry()
+    registry.add(1, None, 0, "Window", 1000)
+    with pytest.raises(KeyError):
+        registry.add(1, None, 0, "Window", 1000)
+
+
+def test_registry_clear_returns_every_entry():
+    registry = WindowRegistry()
+    for hwnd in range(3):
+        registry.add(hwnd, None, 0, "Window", 1000)
+
+    assert [entry.hwnd for entry in registry.clear()] == [0, 1, 2]
+    assert len(registry) == 0
+
+
+def test_group_tracks_its_windows_in_the_registry(app, manager, backend):
+    group = manager.create_group()
+    hwnds = [backend.create_window(f"Window {index}", pid=5000 + index) for index in range(3)]
+    style = backend.windows[hwnds[1]].style
+    group.group_windows(hwnds)
+    assert wait_for(app, lambda: not group.active_embeds)
+
+    entry = group.registry.get(hwnds[1])
+    assert (entry.title, entry.pid, entry.original_style) == ("Window 1", 5001, style)
+    assert group.tabs.tabData(group.tab_index_of(hwnds[1])) == hwnds[1]
+    assert manager.find_group_for_window(hwnds[1]) is group
+
+    group.close_grouped_window(group.tab_index_of(hwnds[1]))
+    assert hwnds[1] not in group.registry
+    assert group.tab_index_of(hwnds[1]) < 0
+    assert wait_for(app, lambda: not group.active_restores)
+    assert backend.windows[hwnds[1]].style == style
+    assert backend.windows[hwnds[1]].parent == 0
+
+
+def fail(*args):
+    raise OSError("access denied")
+
+
+def test_failed_restore_keeps_the_container_of_a_window_still_inside(app, manager, backend, monkeypatch):
+    group = manager.create_group()
+    hwnd = backend.create_window("Window", pid=5000)
+    group.group_windows([hwnd])
+    assert wait_for(app, lambda: not group.active_embeds)
+    container = group.registry.get(hwnd).container
+    # set_text fails before the window is taken out of its container
+    monkeypatch.setattr(backend, "set_text", fail)
+
+    group.close_grouped_window(group.tab_index_of(hwnd))
+    assert wait_for(app, lambda: not group.active_restores)
+    app.processEvents()
+
+    assert backend.windows[hwnd].parent == int(container.winId())
+    assert not container.isVisible()
+
+
+def test_window_that_misses_the_embed_deadline_is_restored_when_it_finishes(app, manager, backend, monkeypatch):
+    monkeypatch.setattr(codigo, "EMBED_DEADLINE_MS", 200)
+    group = manager.create_group()
+    stuck = backend.create_window("Stuck", pid=5000)
+    released = threading.Event()
+    show_window = backend.show_window
+
+    def blocking_show_window(hwnd, command):
+        if hwnd == stuck:
+            released.wait(5)
+        show_window(hwnd, command)
+
+    monkeypatch.setattr(backend, "show_window", blocking_show_window)
+    group.group_windows([stuck])
+    assert wait_for(app, lambda: not group.active_embeds)
+
+    assert stuck not in group.pending_embeds
+    assert manager.find_group_for_window(stuck) is None
+
+    released.set()
+    assert wait_for(app, lambda: not group.abandoned_embeds and not group.active_restores)
+    assert stuck not in group.registry
+    assert backend.windows[stuck].parent == 0
+
+
+def test_tab_indexes_follow_the_tab_bar(app, manager, backend):
+    group = manager.create_group()
+    hwnds = [backend.create_window(f"Window {index}", pid=5000 + index) for index in range(5)]
+    group.group_windows(hwnds)
+    assert wait_for(app, lambda: not group.active_embeds)
+
+    group.close_grouped_window(group.tab_index_of(hwnds[1]))
+    group.remove_dead_window(hwnds[3])
+
+    remaining = [group.tabs.tabData(index) for index in range(group.tabs.count())]
+    assert sorted(remaining) == sorted([hwnds[0], hwnds[2], hwnds[4]])
+    assert all(group.tab_index_of(hwnd) == index for index, hwnd in enumerate(remaining))
+    assert group.tab_index_of(hwnds[1]) == group.tab_index_of(hwnds[3]) == -1
+
+    group.ungroup_all()
+    assert group.tab_indexes == {} and group.tabs.count() == 0
+    assert wait_for(app, lambda: not group.active_restores)
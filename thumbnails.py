@@ -0,0 +1,312 @@
+import logging
+import time
+from collections import OrderedDict, deque
+
+from PyQt5.QtCore import QEvent, QObject, QPoint, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QIcon, QImage, QPixmap
+from PyQt5.QtWidgets import QLabel, QListView, QListWidget, QListWidgetItem
+
+# --- Defaults ---
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_HEIGHT = 200
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+CAPTURES_PER_FRAME = 2
+
+
+def image_size(image):
+    return image.sizeInBytes()
+
+
+def synthetic_capture(hwnd, width, height):
+    # A solid image per window, for headless runs
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor.fromHsv(hwnd * 37 % 360, 160, 200))
+    return image
+
+
+# --- Thumbnail cache ---
+# LRU of window snapshots bounded by total image bytes. Snapshots are only taken when asked
+# for, and only again once the window was marked dirty; peek() never captures at all.
+class ThumbnailCache:
+    def __init__(self, capture, max_bytes=THUMBNAIL_CACHE_BYTES, width=THUMBNAIL_WIDTH, height=THUMBNAIL_HEIGHT,
+                 size_of=image_size):
+        self.capture = capture  # capture(hwnd, width, height) -> image or None
+        self.max_bytes = max_bytes
+        self.width = width
+        self.height = height
+        self.size_of = size_of
+        self.entries = OrderedDict()  # hwnd -> [image, bytes, dirty]
+        self.total_bytes = 0
+        self.hits = 0
+        self.captures = 0
+        self.evictions = 0
+
+    def peek(self, hwnd):
+        # The cached image, possibly stale, without capturing
+        entry = self.entries.get(hwnd)
+        if entry is None:
+            return None
+        self.entries.move_to_end(hwnd)
+        return entry[0]
+
+    def needs_capture(self, hwnd):
+        entry = self.entries.get(hwnd)
+        return entry is None or entry[2]
+
+    def get(self, hwnd):
+        entry = self.entries.get(hwnd)
+        if entry is not None and not entry[2]:
+            self.hits += 1
+            self.entries.move_to_end(hwnd)
+            return entry[0]
+        return self.store(hwnd, self.capture_image(hwnd))
+
+    def capture_image(self, hwnd):
+        # Safe on any thread: it only calls capture and touches no cache state
+        started = time.perf_counter()
+        try:
+            image = self.capture(hwnd, self.width, self.height)
+        except Exception as e:
+            logging.debug(f"Could not capture window {hwnd}: {e}")
+            return None
+        logging.debug(f"Captured window {hwnd} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return image
+
+    def store(self, hwnd, image):
+        # The image to show for hwnd: a failed capture (None) keeps the stale snapshot rather than nothing
+        self.captures += 1
+        if image is None:
+            entry = self.entries.get(hwnd)
+            return entry[0] if entry is not None else None
+        self._store(hwnd, image)
+        return image
+
+    def mark_dirty(self, hwnd):
+        entry = self.entries.get(hwnd)
+        if entry is not None:
+            entry[2] = True
+
+    def forget(self, hwnd):
+        entry = self.entries.pop(hwnd, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _store(self, hwnd, image):
+        self.forget(hwnd)
+        size = self.size_of(image)
+        if size > self.max_bytes:
+            return
+        self.entries[hwnd] = [image, size, False]
+        self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, size, _) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# --- Background capture ---
+# PrintWindow makes the other application render, which can take as long as that application
+# likes, so captures run on worker threads. Finished images are stored on the GUI thread and
+# announced through `ready`. A window is captured by at most one worker at a time.
+class ThumbnailCapturer(QObject):
+    captured = pyqtSignal(object, object)  # hwnd, image or None; emitted on a worker thread
+    ready = pyqtSignal(object)  # hwnd whose cached image changed
+
+    def __init__(self, cache, submit, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.submit = submit  # submit(function, *args) runs function on a worker thread
+        self.in_flight = set()
+        self.captured.connect(self._store)
+
+    def request(self, hwnd):
+        if hwnd in self.in_flight or not self.cache.needs_capture(hwnd):
+            return False
+        self.in_flight.add(hwnd)
+        self.submit(self._capture, hwnd)
+        return True
+
+    def forget(self, hwnd):
+        # A capture still running for hwnd is dropped when it finishes
+        self.in_flight.discard(hwnd)
+        self.cache.forget(hwnd)
+
+    def _capture(self, hwnd):
+        self.captured.emit(hwnd, self.cache.capture_image(hwnd))
+
+    def _store(self, hwnd, image):
+        if hwnd not in self.in_flight:
+            return
+        self.in_flight.discard(hwnd)
+        self.cache.store(hwnd, image)
+        if image is not None:
+            self.ready.emit(hwnd)
+
+
+# --- Overview ---
+# Every window of a group as a tile. Cached snapshots are shown at once, even stale ones;
+# missing or dirty tiles are then captured a few per frame, so opening the overview never
+# makes every application render at the same time.
+class OverviewPanel(QListWidget):
+    def __init__(self, capturer, on_chosen, on_closed, parent=None):
+        super().__init__(parent)
+        cache = capturer.cache
+        self.capturer = capturer
+        self.cache = cache
+        self.on_chosen = on_chosen  # on_chosen(hwnd)
+        self.on_closed = on_closed
+        self.items = {}
+        self.pending = deque()
+        self.setViewMode(QListView.IconMode)
+        self.setIconSize(QSize(cache.width, cache.height))
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setSpacing(8)
+        self.setWordWrap(True)
+        self.setUniformItemSizes(True)
+        self.itemActivated.connect(self.choose)
+        self.itemClicked.connect(self.choose)
+        self.placeholder = QPixmap(cache.width, cache.height)
+        self.placeholder.fill(QColor("#333"))
+        self.capture_timer = QTimer(self)
+        self.capture_timer.setInterval(16)
+        self.capture_timer.timeout.connect(self.capture_next)
+        capturer.ready.connect(self.show_capture)
+
+    def open(self, windows):
+        # windows: (hwnd, title) pairs in tab order
+        self.clear()
+        self.items = {}
+        self.pending.clear()
+        for hwnd, title in windows:
+            item = QListWidgetItem(title)
+            item.setData(Qt.UserRole, hwnd)
+            item.setToolTip(title)
+            image = self.cache.peek(hwnd)
+            item.setIcon(QIcon(QPixmap.fromImage(image) if image is not None else self.placeholder))
+            self.addItem(item)
+            self.items[hwnd] = item
+            if self.cache.needs_capture(hwnd):
+                self.pending.append(hwnd)
+        if self.pending:
+            self.capture_timer.start()
+        self.setFocus()
+
+    def close_overview(self):
+        self.capture_timer.stop()
+        self.pending.clear()
+        self.on_closed()
+
+    def capture_next(self):
+        for _ in range(min(CAPTURES_PER_FRAME, len(self.pending))):
+            self.capturer.request(self.pending.popleft())
+        if not self.pending:
+            self.capture_timer.stop()
+
+    def show_capture(self, hwnd):
+        item = self.items.get(hwnd)
+        image = self.cache.peek(hwnd)
+        if item is not None and image is not None:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def choose(self, item):
+        hwnd = item.data(Qt.UserRole)
+        self.close_overview()
+        self.on_chosen(hwnd)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.close_overview()
+            return
+        super().keyPressEvent(event)
+
+
+# --- Tab hover previews ---
+# Shows the snapshot of a background tab while the mouse rests on it: the cached one at once,
+# then a fresh one if the window changed since.
+class TabHoverPreview(QObject):
+    def __init__(self, tabs, capturer, delay_ms=300):
+        super().__init__(tabs)
+        self.tabs = tabs
+        self.capturer = capturer
+        self.cache = capturer.cache
+        self.previewed = None
+        self.hovered = -1
+        self.popup = QLabel(None, Qt.ToolTip)
+        self.popup.setStyleSheet("border: 1px solid #555; background: #222;")
+        self.show_timer = QTimer(self)
+        self.show_timer.setSingleShot(True)
+        self.show_timer.setInterval(delay_ms)
+        self.show_timer.timeout.connect(self.show_preview)
+        capturer.ready.connect(self.show_capture)
+        tabs.setMouseTracking(True)
+        tabs.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.MouseMove:
+            index = self.tabs.tabAt(event.pos())
+            if index != self.hovered:
+                self.hovered = index
+                self.previewed = None
+                self.popup.hide()
+                if index >= 0 and index != self.tabs.currentIndex():
+                    self.show_timer.start()
+        elif event.type() in (QEvent.Leave, QEvent.MouseButtonPress):
+            self.hovered = -1
+            self.previewed = None
+            self.show_timer.stop()
+            self.popup.hide()
+        return False
+
+    def show_preview(self):
+        if self.hovered < 0 or self.hovered >= self.tabs.count():
+            return
+        self.previewed = self.tabs.tabData(self.hovered)
+        self.capturer.request(self.previewed)
+        self.show_image(self.cache.peek(self.previewed))
+
+    def show_capture(self, hwnd):
+        if hwnd == self.previewed:
+            self.show_image(self.cache.peek(hwnd))
+
+    def show_image(self, image):
+        if image is None:
+            return
+        self.popup.setPixmap(QPixmap.fromImage(image))
+        self.popup.adjustSize()
+        tab_rect = self.tabs.tabRect(self.hovered)
+        self.popup.move(self.tabs.mapToGlobal(QPoint(tab_rect.left(), tab_rect.bottom() + 4)))
+        self.popup.show()
+
+
+# --- Benchmark ---
+# python thumbnails.py
+if __name__ == '__main__':
+    image_bytes = THUMBNAIL_WIDTH * THUMBNAIL_HEIGHT * 4
+    cache = ThumbnailCache(synthetic_capture, max_bytes=50 * image_bytes)
+    started = time.perf_counter()
+    for hwnd in range(200):
+        cache.get(hwnd)
+    capture_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for _ in range(10):
+        for hwnd in range(150, 200):
+            cache.get(hwnd)
+    hit_us = (time.perf_counter() - started) / 500 * 1e6
+    for hwnd in range(150, 160):
+        cache.mark_dirty(hwnd)
+    for hwnd in range(150, 200):
+        cache.get(hwnd)
+    print(f"200 captures in {capture_ms:.1f} ms, {len(cache)} cached ({cache.total_bytes / 2 ** 20:.1f} MB of "
+          f"{cache.max_bytes / 2 ** 20:.1f} MB), {cache.evictions} evicted, hit {hit_us:.2f} us, "
+          f"{cache.captures} captures after 10 dirty windows")
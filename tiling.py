@@ -0,0 +1,156 @@
+import math
+import time
+
+
+# --- Layout functions ---
+# Each one returns `count` pane rectangles (x, y, width, height) covering width x height,
+# in slot order, in O(count).
+def split_length(length, parts):
+    # Integer sizes that add up exactly to length
+    return [(length * (i + 1)) // parts - (length * i) // parts for i in range(parts)]
+
+
+def balanced_layout(count, width, height):
+    if count <= 0:
+        return []
+    columns = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / columns)
+    rects = []
+    y = 0
+    for row, row_height in enumerate(split_length(height, rows)):
+        # The last row may hold fewer panes; they share its full width
+        in_row = min(columns, count - row * columns)
+        x = 0
+        for column_width in split_length(width, in_row):
+            rects.append((x, y, column_width, row_height))
+            x += column_width
+        y += row_height
+    return rects
+
+
+def master_stack_layout(count, width, height, master_ratio=0.6):
+    if count <= 0:
+        return []
+    if count == 1:
+        return [(0, 0, width, height)]
+    master_width = int(width * master_ratio)
+    rects = [(0, 0, master_width, height)]
+    y = 0
+    for pane_height in split_length(height, count - 1):
+        rects.append((master_width, y, width - master_width, pane_height))
+        y += pane_height
+    return rects
+
+
+def bsp_layout(count, width, height):
+    # Binary space partition: panes 2^d .. 2^(d+1)-1 each split one pane of the previous level
+    # along its longer side. Panes stay within a factor of two in size, and adding or removing
+    # the last window only changes the one pane it was split from.
+    if count <= 0:
+        return []
+    rects = [(0, 0, width, height)]
+    level = 1
+    for index in range(1, count):
+        if index == level * 2:
+            level *= 2
+        x, y, w, h = rects[index - level]
+        if w >= h:
+            half = w // 2
+            rects[index - level] = (x, y, half, h)
+            rects.append((x + half, y, w - half, h))
+        else:
+            half = h // 2
+            rects[index - level] = (x, y, w, half)
+            rects.append((x, y + half, w, h - half))
+    return rects
+
+
+LAYOUTS = {
+    'balanced': balanced_layout,
+    'master_stack': master_stack_layout,
+    'bsp': bsp_layout,
+}
+
+
+# --- Layout state ---
+# Keeps the pane order and the last computed rectangles, so callers only
+# move the panes whose rectangle actually changed.
+class TilingLayout:
+    def __init__(self, kind='balanced', gap=4):
+        if kind not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {kind!r}")
+        self.kind = kind
+        self.gap = gap
+        self.keys = []
+        self.positions = {}
+        self.rects = {}
+
+    def add(self, key):
+        if key not in self.positions:
+            self.positions[key] = len(self.keys)
+            self.keys.append(key)
+            self.rects[key] = None
+
+    def remove(self, key):
+        # The last pane takes over the freed slot, so every other pane keeps its place
+        index = self.positions.pop(key, None)
+        if index is None:
+            return
+        del self.rects[key]
+        last = self.keys.pop()
+        if last is not key:
+            self.keys[index] = last
+            self.positions[last] = index
+
+    def clear(self):
+        self.keys = []
+        self.positions = {}
+        self.rects = {}
+
+    def invalidate(self):
+        for key in self.keys:
+            self.rects[key] = None
+
+    def set_kind(self, kind):
+        if kind not in LAYOUTS:
+            raise ValueError(f"Unknown layout: {kind!r}")
+        self.kind = kind
+
+    def compute(self, width, height):
+        gap = self.gap
+        rects = LAYOUTS[self.kind](len(self.keys), width + gap, height + gap)
+        # The grid is computed with one extra gap and each pane gives up a gap on its right and bottom
+        return [(x, y, max(w - gap, 0), max(h - gap, 0)) for x, y, w, h in rects]
+
+    def relayout(self, width, height):
+        changed = {}
+        for key, rect in zip(self.keys, self.compute(width, height)):
+            if self.rects[key] != rect:
+                self.rects[key] = rect
+                changed[key] = rect
+        return changed
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# --- Benchmark ---
+# python tiling.py
+if __name__ == '__main__':
+    for kind in LAYOUTS:
+        for count in (1, 10, 25, 50, 100):
+            layout = TilingLayout(kind)
+            for key in range(count):
+                layout.add(key)
+            runs = 1000
+            started = time.perf_counter()
+            for _ in range(runs):
+                layout.compute(1920, 1080)
+            compute_us = (time.perf_counter() - started) / runs * 1e6
+            layout.relayout(1920, 1080)
+            layout.add(count)
+            added = len(layout.relayout(1920, 1080))
+            layout.remove(count // 2)
+            removed = len(layout.relayout(1920, 1080))
+            print(f"{kind:>12} N={count:<4} compute {compute_us:8.1f} us   "
+                  f"panes moved on add: {added:<4} on remove: {removed}")
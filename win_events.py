@@ -0,0 +1,199 @@
+import ctypes
+import logging
+from ctypes import wintypes
+
+# --- WinEvent constants ---
+EVENT_SYSTEM_MOVESIZESTART = 0x000A
+EVENT_SYSTEM_MOVESIZEEND = 0x000B
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_HIDE = 0x8003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+
+
+# --- Drag event sources ---
+# A drag source reports when a top-level window starts and stops being moved.
+# The grouper only reacts to these notifications, so nothing runs while idle.
+class DragEventSource:
+    def __init__(self):
+        self.on_drag_started = None
+        self.on_drag_finished = None
+
+    def start(self, on_drag_started, on_drag_finished):
+        self.on_drag_started = on_drag_started
+        self.on_drag_finished = on_drag_finished
+
+    def stop(self):
+        self.on_drag_started = None
+        self.on_drag_finished = None
+
+    def emit_started(self, hwnd, cursor_pos):
+        if self.on_drag_started:
+            self.on_drag_started(hwnd, cursor_pos)
+
+    def emit_finished(self, hwnd, cursor_pos):
+        if self.on_drag_finished:
+            self.on_drag_finished(hwnd, cursor_pos)
+
+
+# --- WinEvent hooks ---
+# Installs out-of-context hooks for the given (first, last) event ranges. The notifications are
+# delivered through the message loop of the installing thread (the Qt event loop).
+class WinEventHooks:
+    def __init__(self, event_ranges, handler, flags=WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS):
+        self.event_ranges = event_ranges
+        self.handler = handler
+        self.flags = flags
+        self.hooks = []
+        self._callback = None
+
+    def install(self):
+        if self.hooks:
+            return True
+        user32 = ctypes.windll.user32
+        win_event_proc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG,
+                                            wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.UINT, wintypes.UINT, wintypes.HMODULE, win_event_proc,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.UINT]
+        # The callback object must stay referenced for as long as the hooks are installed
+        self._callback = win_event_proc(self._dispatch)
+        for first, last in self.event_ranges:
+            hook = user32.SetWinEventHook(first, last, None, self._callback, 0, 0, self.flags)
+            if not hook:
+                self.uninstall()
+                return False
+            self.hooks.append(hook)
+        return True
+
+    def uninstall(self):
+        for hook in self.hooks:
+            ctypes.windll.user32.UnhookWinEvent(hook)
+        self.hooks = []
+        self._callback = None
+
+    def _dispatch(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        # Only whole-window notifications matter here, not those of controls inside a window
+        if id_object != OBJID_WINDOW or id_child != CHILDID_SELF or not hwnd:
+            return
+        try:
+            self.handler(event, hwnd)
+        except Exception as e:
+            # Exceptions must never propagate back into the native callback
+            logging.error(f"Error handling window event {event:#x}: {e}")
+
+
+class WinEventDragSource(DragEventSource):
+    def __init__(self):
+        super().__init__()
+        self.hooks = WinEventHooks([(EVENT_SYSTEM_MOVESIZESTART, EVENT_SYSTEM_MOVESIZEEND)], self._handle_win_event)
+
+    def start(self, on_drag_started, on_drag_finished):
+        super().start(on_drag_started, on_drag_finished)
+        if self.hooks.hooks:
+            return
+        if self.hooks.install():
+            logging.info("Move/size event hook installed.")
+        else:
+            logging.error("Could not install the move/size event hook. Drag detection is disabled.")
+
+    def stop(self):
+        self.hooks.uninstall()
+        super().stop()
+
+    def _handle_win_event(self, event, hwnd):
+        point = wintypes.POINT()
+        ctypes.windll.user32.GetCursorPos(ctypes.byref(point))
+        cursor_pos = (point.x, point.y)
+        if event == EVENT_SYSTEM_MOVESIZESTART:
+            self.emit_started(hwnd, cursor_pos)
+        elif event == EVENT_SYSTEM_MOVESIZEEND:
+            self.emit_finished(hwnd, cursor_pos)
+
+
+# --- Scripted source for headless runs ---
+# Replays a list of ('start' | 'end', hwnd, (x, y)) steps through the same callbacks.
+class ScriptedDragSource(DragEventSource):
+    def __init__(self, script=()):
+        super().__init__()
+        self.script = list(script)
+
+    def replay(self):
+        for kind, hwnd, cursor_pos in self.script:
+            if kind == 'start':
+                self.emit_started(hwnd, cursor_pos)
+            elif kind == 'end':
+                self.emit_finished(hwnd, cursor_pos)
+            else:
+                raise ValueError(f"Unknown drag step: {kind!r}")
+
+
+# --- Window lifecycle sources ---
+# Report windows being created, destroyed, shown, hidden or renamed. The listener is any
+# object with window_created, window_destroyed, window_shown, window_hidden and window_renamed
+# methods taking an hwnd.
+class WindowEventSource:
+    def __init__(self):
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def emit(self, kind, hwnd):
+        for listener in list(self.listeners):
+            getattr(listener, f"window_{kind}")(hwnd)
+
+
+class WinEventWindowSource(WindowEventSource):
+    EVENT_KINDS = {EVENT_OBJECT_CREATE: 'created', EVENT_OBJECT_DESTROY: 'destroyed',
+                   EVENT_OBJECT_SHOW: 'shown', EVENT_OBJECT_HIDE: 'hidden', EVENT_OBJECT_NAMECHANGE: 'renamed'}
+
+    def __init__(self):
+        super().__init__()
+        # Two ranges on purpose: a single range would include EVENT_OBJECT_LOCATIONCHANGE, which fires constantly
+        self.hooks = WinEventHooks([(EVENT_OBJECT_CREATE, EVENT_OBJECT_HIDE),
+                                    (EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE)], self._handle_win_event)
+
+    def start(self):
+        if self.hooks.hooks:
+            return
+        if self.hooks.install():
+            logging.info("Window lifecycle event hooks installed.")
+        else:
+            logging.error("Could not install the window lifecycle event hooks.")
+
+    def stop(self):
+        self.hooks.uninstall()
+
+    def _handle_win_event(self, event, hwnd):
+        kind = self.EVENT_KINDS.get(event)
+        if kind:
+            self.emit(kind, hwnd)
+
+
+# Replays a list of ('created' | 'destroyed' | 'shown' | 'hidden' | 'renamed', hwnd) steps.
+class ScriptedWindowSource(WindowEventSource):
+    def __init__(self, script=()):
+        super().__init__()
+        self.script = list(script)
+
+    def replay(self):
+        for kind, hwnd in self.script:
+            if kind not in WinEventWindowSource.EVENT_KINDS.values():
+                raise ValueError(f"Unknown window event: {kind!r}")
+            self.emit(kind, hwnd)
@@ -0,0 +1,317 @@
+import ctypes
+import itertools
+import time
+from collections import Counter
+
+from layout_scheduler import Win32GeometryBackend
+
+# --- Win32 constants used by the grouper ---
+GWL_STYLE = -16
+WS_CHILD = 0x40000000
+WS_CAPTION = 0x00C00000
+WS_VISIBLE = 0x10000000
+WS_OVERLAPPEDWINDOW = 0x00CF0000
+SW_HIDE = 0
+SW_SHOW = 5
+SW_MINIMIZE = 6
+SW_RESTORE = 9
+SWP_NOSIZE = 0x0001
+SWP_NOMOVE = 0x0002
+SWP_NOZORDER = 0x0004
+SWP_FRAMECHANGED = 0x0020
+HWND_TOPMOST = -1
+HWND_NOTOPMOST = -2
+PW_CLIENTONLY = 0x1
+PW_RENDERFULLCONTENT = 0x2
+DIB_RGB_COLORS = 0
+WM_NULL = 0x0000
+SMTO_BLOCK = 0x0001
+SMTO_ABORTIFHUNG = 0x0002
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [("biSize", ctypes.c_uint32), ("biWidth", ctypes.c_int32), ("biHeight", ctypes.c_int32),
+                ("biPlanes", ctypes.c_uint16), ("biBitCount", ctypes.c_uint16), ("biCompression", ctypes.c_uint32),
+                ("biSizeImage", ctypes.c_uint32), ("biXPelsPerMeter", ctypes.c_int32),
+                ("biYPelsPerMeter", ctypes.c_int32), ("biClrUsed", ctypes.c_uint32), ("biClrImportant", ctypes.c_uint32)]
+
+
+# --- Window backends ---
+# Every Win32 call the grouper makes goes through one of these, so the same code runs against
+# the desktop or against in-memory windows. WIN32_CALLS lists the primitive calls.
+class WindowBackend:
+    WIN32_CALLS = ('is_window', 'get_text', 'set_text', 'get_class_name', 'get_style', 'set_style',
+                   'get_window_pid', 'get_parent', 'set_parent', 'is_visible', 'show_window', 'show_window_async',
+                   'set_window_pos', 'client_to_screen', 'get_cursor_pos', 'post_message', 'enum_windows',
+                   'capture_window', 'is_responsive')
+
+    def describe_window(self, hwnd):
+        # (title, class name, pid, visible) of a top-level window, None for child or dead windows
+        if not self.is_window(hwnd) or self.get_style(hwnd) & WS_CHILD:
+            return None
+        return self.get_text(hwnd), self.get_class_name(hwnd), self.get_window_pid(hwnd), bool(self.is_visible(hwnd))
+
+    def geometry_backend(self):
+        raise NotImplementedError
+
+
+class Win32WindowBackend(WindowBackend):
+    def __init__(self):
+        # Imported here so the rest of the grouper can be loaded without pywin32
+        import win32api
+        import win32gui
+        import win32process
+        from ctypes import wintypes
+
+        self.win32process = win32process
+        self.set_window_long_ptr = ctypes.windll.user32.SetWindowLongPtrW
+        self.set_window_long_ptr.restype = ctypes.c_void_p
+        self.set_window_long_ptr.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_void_p]
+        self.show_window_async = ctypes.windll.user32.ShowWindowAsync
+        self.send_message_timeout = ctypes.windll.user32.SendMessageTimeoutW
+        self.send_message_timeout.restype = wintypes.LPARAM
+        self.send_message_timeout.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM,
+                                              wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)]
+        self._configure_gdi(wintypes)
+        # One-to-one calls are bound directly, so they cost no more than calling pywin32 itself
+        self.is_window = win32gui.IsWindow
+        self.get_text = win32gui.GetWindowText
+        self.set_text = win32gui.SetWindowText
+        self.get_class_name = win32gui.GetClassName
+        self.get_parent = win32gui.GetParent
+        self.set_parent = win32gui.SetParent
+        self.is_visible = win32gui.IsWindowVisible
+        self.show_window = win32gui.ShowWindow
+        self.set_window_pos = win32gui.SetWindowPos
+        self.client_to_screen = win32gui.ClientToScreen
+        self.get_cursor_pos = win32gui.GetCursorPos
+        self.post_message = win32api.PostMessage
+        self._get_window_long = win32gui.GetWindowLong
+        self._enum_windows = win32gui.EnumWindows
+
+    def get_style(self, hwnd):
+        return self._get_window_long(hwnd, GWL_STYLE)
+
+    def set_style(self, hwnd, style):
+        self.set_window_long_ptr(hwnd, GWL_STYLE, style)
+
+    def get_window_pid(self, hwnd):
+        return self.win32process.GetWindowThreadProcessId(hwnd)[1]
+
+    def is_responsive(self, hwnd, timeout_ms):
+        # WM_NULL does nothing, so an answer only shows the window's thread is pumping messages
+        result = ctypes.c_size_t()
+        return bool(self.send_message_timeout(hwnd, WM_NULL, 0, 0, SMTO_BLOCK | SMTO_ABORTIFHUNG, timeout_ms,
+                                              ctypes.byref(result)))
+
+    def enum_windows(self):
+        hwnds = []
+        self._enum_windows(lambda hwnd, _: hwnds.append(hwnd) or True, None)
+        return hwnds
+
+    def geometry_backend(self):
+        return Win32GeometryBackend()
+
+    def _configure_gdi(self, wintypes):
+        user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+        # Handles are pointer sized; the default int return type would truncate them
+        for function, argtypes in ((user32.GetDC, [wintypes.HWND]), (gdi32.CreateCompatibleDC, [wintypes.HDC]),
+                                   (gdi32.CreateCompatibleBitmap, [wintypes.HDC, ctypes.c_int, ctypes.c_int]),
+                                   (gdi32.SelectObject, [wintypes.HDC, wintypes.HGDIOBJ])):
+            function.restype = wintypes.HANDLE
+            function.argtypes = argtypes
+        user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+        user32.GetClientRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+        user32.IsHungAppWindow.argtypes = [wintypes.HWND]
+        gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT, ctypes.c_void_p,
+                                    ctypes.c_void_p, wintypes.UINT]
+        gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        self.user32, self.gdi32, self.rect_type = user32, gdi32, wintypes.RECT
+
+    def capture_window(self, hwnd, width, height):
+        # PrintWindow makes the application render into our bitmap, so it works for covered and
+        # hidden windows too. Hung windows would block it and are skipped.
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtGui import QImage
+
+        user32, gdi32 = self.user32, self.gdi32
+        if user32.IsHungAppWindow(hwnd):
+            return None
+        rect = self.rect_type()
+        user32.GetClientRect(hwnd, ctypes.byref(rect))
+        source_width, source_height = rect.right - rect.left, rect.bottom - rect.top
+        if source_width <= 0 or source_height <= 0:
+            return None
+        window_dc = user32.GetDC(hwnd)
+        memory_dc = gdi32.CreateCompatibleDC(window_dc)
+        bitmap = gdi32.CreateCompatibleBitmap(window_dc, source_width, source_height)
+        previous = gdi32.SelectObject(memory_dc, bitmap)
+        try:
+            user32.PrintWindow(hwnd, memory_dc, PW_CLIENTONLY | PW_RENDERFULLCONTENT)
+            # Negative height: top-down rows, as QImage expects
+            header = BITMAPINFOHEADER(ctypes.sizeof(BITMAPINFOHEADER), source_width, -source_height, 1, 32, 0)
+            pixels = ctypes.create_string_buffer(source_width * source_height * 4)
+            gdi32.GetDIBits(memory_dc, bitmap, 0, source_height, pixels, ctypes.byref(header), DIB_RGB_COLORS)
+        finally:
+            gdi32.SelectObject(memory_dc, previous)
+            gdi32.DeleteObject(bitmap)
+            gdi32.DeleteDC(memory_dc)
+            user32.ReleaseDC(hwnd, window_dc)
+        data = pixels.raw
+        image = QImage(data, source_width, source_height, source_width * 4, QImage.Format_RGB32)
+        return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+# --- Simulated backend ---
+# In-memory windows for headless runs and benchmarks. Each call can be given a latency, either
+# one for every call or per call name, to model a busy desktop or a slow application. Windows
+# in `hung` never answer the responsiveness probe.
+class SimulatedWindow:
+    __slots__ = ('hwnd', 'title', 'class_name', 'pid', 'style', 'parent', 'visible', 'rect')
+
+    def __init__(self, hwnd, title, class_name, pid, style):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.pid = pid
+        self.style = style
+        self.parent = 0
+        self.visible = bool(style & WS_VISIBLE)
+        self.rect = (100, 100, 800, 600)
+
+
+class SimulatedWindowBackend(WindowBackend):
+    def __init__(self, latency=0.0, latencies=None):
+        self.latency = latency
+        self.latencies = latencies or {}
+        self.windows = {}
+        self.call_counts = Counter()
+        self.cursor_pos = (0, 0)
+        self.posted = []
+        self.hung = set()
+        self._next_hwnd = itertools.count(0x10000, 4)
+
+    def create_window(self, title, class_name="SimulatedWindow", pid=1000, style=WS_VISIBLE | WS_OVERLAPPEDWINDOW):
+        hwnd = next(self._next_hwnd)
+        self.windows[hwnd] = SimulatedWindow(hwnd, title, class_name, pid, style)
+        return hwnd
+
+    def destroy_window(self, hwnd):
+        self.windows.pop(hwnd, None)
+
+    def _call(self, name, hwnd=None):
+        self.call_counts[name] += 1
+        delay = self.latencies.get(name, self.latency)
+        if delay:
+            time.sleep(delay)
+        if hwnd is None:
+            return None
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise OSError(f"Invalid window handle {hwnd}")
+        return window
+
+    def is_window(self, hwnd):
+        self._call('is_window')
+        return hwnd in self.windows
+
+    def get_text(self, hwnd):
+        return self._call('get_text', hwnd).title
+
+    def set_text(self, hwnd, text):
+        self._call('set_text', hwnd).title = text
+
+    def get_class_name(self, hwnd):
+        return self._call('get_class_name', hwnd).class_name
+
+    def get_style(self, hwnd):
+        return self._call('get_style', hwnd).style
+
+    def set_style(self, hwnd, style):
+        self._call('set_style', hwnd).style = style
+
+    def get_window_pid(self, hwnd):
+        return self._call('get_window_pid', hwnd).pid
+
+    def get_parent(self, hwnd):
+        return self._call('get_parent', hwnd).parent
+
+    def set_parent(self, hwnd, parent):
+        self._call('set_parent', hwnd).parent = parent or 0
+
+    def is_visible(self, hwnd):
+        return self._call('is_visible', hwnd).visible
+
+    def show_window(self, hwnd, command):
+        self._call('show_window', hwnd).visible = command not in (SW_HIDE, SW_MINIMIZE)
+
+    def show_window_async(self, hwnd, command):
+        self.show_window(hwnd, command)
+
+    def set_window_pos(self, hwnd, insert_after, x, y, width, height, flags):
+        # Our own Qt windows are not simulated; moving them is a no-op
+        self._call('set_window_pos')
+        window = self.windows.get(hwnd)
+        if window is not None and not flags & (SWP_NOMOVE | SWP_NOSIZE):
+            window.rect = (x, y, width, height)
+
+    def client_to_screen(self, hwnd, point):
+        x, y = self._call('client_to_screen', hwnd).rect[:2]
+        return x + point[0], y + point[1]
+
+    def get_cursor_pos(self):
+        self._call('get_cursor_pos')
+        return self.cursor_pos
+
+    def post_message(self, hwnd, message, wparam, lparam):
+        self._call('post_message', hwnd)
+        self.posted.append((hwnd, message, wparam, lparam))
+
+    def is_responsive(self, hwnd, timeout_ms):
+        self._call('is_responsive', hwnd)
+        if hwnd in self.hung:
+            time.sleep(timeout_ms / 1000)
+            return False
+        return True
+
+    def enum_windows(self):
+        self._call('enum_windows')
+        return list(self.windows)
+
+    def capture_window(self, hwnd, width, height):
+        from thumbnails import synthetic_capture
+
+        self._call('capture_window', hwnd)
+        return synthetic_capture(hwnd, width, height)
+
+    def geometry_backend(self):
+        return SimulatedGeometryBackend(self)
+
+
+class SimulatedGeometryBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.commit_count = 0
+        self.move_count = 0
+        self.redraw_count = 0
+
+    def commit(self, geometries):
+        # Same calls as Win32GeometryBackend: one deferred transaction per group of siblings,
+        # one SetWindowPos for a window alone under its parent
+        self.commit_count += 1
+        by_parent = Counter()
+        for hwnd, x, y, width, height in geometries:
+            window = self.backend.windows.get(hwnd)
+            if window is not None:
+                by_parent[window.parent] += 1
+                window.rect = (x, y, width, height)
+                self.move_count += 1
+        for siblings in by_parent.values():
+            self.backend._call('defer_window_pos' if siblings > 1 else 'set_window_pos')
+
+    def redraw(self, hwnds):
+        for hwnd in hwnds:
+            self.backend._call('redraw_window')
+            self.redraw_count += 1
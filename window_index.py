@@ -0,0 +1,141 @@
+import logging
+
+import psutil
+
+
+# --- Index of top-level windows ---
+# Built with one enumeration at startup and then kept current from window lifecycle
+# events (see win_events.WindowEventSource), so nothing re-enumerates the desktop.
+class IndexedWindow:
+    __slots__ = ('hwnd', 'title', 'class_name', 'pid', 'process', 'exe', 'visible')
+
+    def __init__(self, hwnd, title, class_name, pid, process, exe, visible):
+        self.hwnd = hwnd
+        self.title = title
+        self.class_name = class_name
+        self.pid = pid
+        self.process = process
+        self.exe = exe
+        self.visible = visible
+
+    def as_dict(self):
+        return {"hwnd": self.hwnd, "title": self.title, "class": self.class_name, "pid": self.pid,
+                "process": self.process, "exe": self.exe}
+
+    def __repr__(self):
+        return f"IndexedWindow(hwnd={self.hwnd}, title={self.title!r}, process={self.process!r})"
+
+
+def read_process_info(pid):
+    try:
+        process = psutil.Process(pid)
+        name = process.name()
+    except psutil.Error:
+        return "", ""
+    try:
+        exe = process.exe()
+    except psutil.Error:
+        exe = ""
+    return name, exe
+
+
+class WindowIndex:
+    def __init__(self, describe_window, process_info=read_process_info):
+        # describe_window(hwnd) -> (title, class_name, pid, visible), or None for windows that are not top-level
+        self.describe_window = describe_window
+        self.process_info = process_info
+        self.windows = {}
+        # pid -> [name, exe, window count]; dropped with the last window of the process
+        self.processes = {}
+        self.listeners = []
+
+    def subscribe(self, listener):
+        # listener(kind, window) with kind in 'added', 'updated', 'removed'
+        self.listeners.append(listener)
+
+    def rebuild(self, hwnds):
+        for hwnd in list(self.windows):
+            self._remove(hwnd)
+        for hwnd in hwnds:
+            self._add(hwnd)
+        logging.info(f"Window index built with {len(self.windows)} top-level windows.")
+
+    def get(self, hwnd):
+        return self.windows.get(hwnd)
+
+    def visible_windows(self):
+        return [window for window in self.windows.values() if window.visible and window.title]
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __contains__(self, hwnd):
+        return hwnd in self.windows
+
+    # --- Window event listener ---
+    def window_created(self, hwnd):
+        if hwnd not in self.windows:
+            self._notify('added', self._add(hwnd))
+
+    def window_destroyed(self, hwnd):
+        window = self._remove(hwnd)
+        if window:
+            self._notify('removed', window)
+
+    def window_shown(self, hwnd):
+        self._refresh(hwnd)
+
+    def window_hidden(self, hwnd):
+        window = self.windows.get(hwnd)
+        if window and window.visible:
+            window.visible = False
+            self._notify('updated', window)
+
+    def window_renamed(self, hwnd):
+        # Controls inside windows are renamed all the time; only known top-level windows matter
+        if hwnd in self.windows:
+            self._refresh(hwnd)
+
+    # --- Internals ---
+    def _refresh(self, hwnd):
+        window = self.windows.get(hwnd)
+        if not window:
+            self._notify('added', self._add(hwnd))
+            return
+        description = self.describe_window(hwnd)
+        if description is None:
+            # Reparented (for example embedded by a group), so no longer top-level
+            self._notify('removed', self._remove(hwnd))
+            return
+        window.title, window.class_name, _, window.visible = description
+        self._notify('updated', window)
+
+    def _add(self, hwnd):
+        description = self.describe_window(hwnd)
+        if description is None:
+            return None
+        title, class_name, pid, visible = description
+        process = self.processes.get(pid)
+        if process is None:
+            name, exe = self.process_info(pid)
+            process = self.processes[pid] = [name, exe, 0]
+        process[2] += 1
+        window = IndexedWindow(hwnd, title, class_name, pid, process[0], process[1], visible)
+        self.windows[hwnd] = window
+        return window
+
+    def _remove(self, hwnd):
+        window = self.windows.pop(hwnd, None)
+        if window:
+            process = self.processes.get(window.pid)
+            if process:
+                process[2] -= 1
+                if process[2] <= 0:
+                    del self.processes[window.pid]
+        return window
+
+    def _notify(self, kind, window):
+        if window is None:
+            return
+        for listener in self.listeners:
+            listener(kind, window)
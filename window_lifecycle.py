@@ -0,0 +1,144 @@
+import logging
+import threading
+
+import psutil
+
+
+# --- Lifecycle of grouped windows ---
+# A window event listener (see win_events.WindowEventSource) for the windows that are grouped.
+# A destroy notification reaps the window at once; renames are collected and reported at most
+# once per frame. Process exits are the fallback for windows whose destroy notification never
+# arrives, and are confirmed with is_window before the window is reaped.
+class WindowLifecycle:
+    def __init__(self, schedule, is_window, get_text, on_dead, on_retitled, process_watcher=None, frame_ms=16):
+        self.schedule = schedule  # schedule(delay_ms, callback)
+        self.is_window = is_window
+        self.get_text = get_text
+        self.on_dead = on_dead  # on_dead(hwnd)
+        self.on_retitled = on_retitled  # on_retitled({hwnd: title})
+        self.process_watcher = process_watcher
+        self.frame_ms = frame_ms
+        self.tracked = {}  # hwnd -> pid
+        self.by_pid = {}  # pid -> set of hwnds
+        self.pending_titles = set()
+        self.frame_scheduled = False
+
+    def track(self, hwnd, pid):
+        self.tracked[hwnd] = pid
+        if pid not in self.by_pid:
+            self.by_pid[pid] = set()
+            if self.process_watcher:
+                self.process_watcher.watch(pid)
+        self.by_pid[pid].add(hwnd)
+
+    def untrack(self, hwnd):
+        pid = self.tracked.pop(hwnd, None)
+        self.pending_titles.discard(hwnd)
+        hwnds = self.by_pid.get(pid)
+        if hwnds is None:
+            return
+        hwnds.discard(hwnd)
+        if not hwnds:
+            del self.by_pid[pid]
+            if self.process_watcher:
+                self.process_watcher.unwatch(pid)
+
+    def _reap(self, hwnd, reason):
+        self.untrack(hwnd)
+        logging.info(f"Grouped window {hwnd} {reason}. Removing it.")
+        self.on_dead(hwnd)
+
+    # --- Window events ---
+    def window_destroyed(self, hwnd):
+        if hwnd in self.tracked:
+            self._reap(hwnd, "was destroyed")
+
+    def window_renamed(self, hwnd):
+        if hwnd not in self.tracked:
+            return
+        self.pending_titles.add(hwnd)
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.schedule(self.frame_ms, self.flush_titles)
+
+    def window_created(self, hwnd):
+        pass
+
+    def window_shown(self, hwnd):
+        pass
+
+    def window_hidden(self, hwnd):
+        pass
+
+    def flush_titles(self):
+        self.frame_scheduled = False
+        hwnds, self.pending_titles = self.pending_titles, set()
+        titles = {}
+        for hwnd in hwnds:
+            try:
+                titles[hwnd] = self.get_text(hwnd)
+            except Exception:
+                # Destroyed since the rename; the destroy notification reaps it
+                continue
+        if titles:
+            self.on_retitled(titles)
+
+    # --- Process exits ---
+    def process_exited(self, pid):
+        for hwnd in list(self.by_pid.get(pid, ())):
+            if not self.is_window(hwnd):
+                self._reap(hwnd, f"is gone (process {pid} exited)")
+
+
+# --- Process exit watcher ---
+# One background thread waits on every watched process and calls on_exit(pid) from that
+# thread when one ends.
+class ProcessExitWatcher:
+    def __init__(self, on_exit, timeout=1.0):
+        self.on_exit = on_exit
+        self.timeout = timeout
+        self.processes = {}
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.stopped = False
+        self.thread = None
+
+    def watch(self, pid):
+        try:
+            process = psutil.Process(pid)
+        except psutil.Error:
+            self.on_exit(pid)
+            return
+        with self.lock:
+            self.processes[pid] = process
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="process-exit-watcher", daemon=True)
+            self.thread.start()
+        self.changed.set()
+
+    def unwatch(self, pid):
+        with self.lock:
+            self.processes.pop(pid, None)
+
+    def stop(self):
+        self.stopped = True
+        self.changed.set()
+
+    def _run(self):
+        while not self.stopped:
+            with self.lock:
+                processes = list(self.processes.values())
+            if not processes:
+                self.changed.wait()
+                self.changed.clear()
+                continue
+            try:
+                gone, _ = psutil.wait_procs(processes, timeout=self.timeout)
+            except psutil.Error as e:
+                logging.error(f"Error watching processes: {e}")
+                continue
+            for process in gone:
+                with self.lock:
+                    watched = self.processes.pop(process.pid, None) is not None
+                if watched and not self.stopped:
+                    self.on_exit(process.pid)
@@ -0,0 +1,48 @@
+# --- Registry of grouped windows ---
+# Single source of truth for the windows embedded in a group, keyed by hwnd.
+# Tab and grid mode both read from it, so lookups never walk the widget tree.
+class GroupedWindow:
+    __slots__ = ('hwnd', 'container', 'original_style', 'title', 'pid')
+
+    def __init__(self, hwnd, container, original_style, title, pid):
+        self.hwnd = hwnd
+        self.container = container
+        self.original_style = original_style
+        self.title = title
+        self.pid = pid
+
+    def __repr__(self):
+        return f"GroupedWindow(hwnd={self.hwnd}, title={self.title!r}, pid={self.pid})"
+
+
+class WindowRegistry:
+    def __init__(self):
+        # Insertion order is grouping order, which is also the tab order
+        self._entries = {}
+
+    def add(self, hwnd, container, original_style, title, pid):
+        if hwnd in self._entries:
+            raise KeyError(f"Window {hwnd} is already grouped")
+        entry = GroupedWindow(hwnd, container, original_style, title, pid)
+        self._entries[hwnd] = entry
+        return entry
+
+    def remove(self, hwnd):
+        return self._entries.pop(hwnd, None)
+
+    def get(self, hwnd):
+        return self._entries.get(hwnd)
+
+    def clear(self):
+        entries = list(self._entries.values())
+        self._entries.clear()
+        return entries
+
+    def __contains__(self, hwnd):
+        return hwnd in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))